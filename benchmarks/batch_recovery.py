@@ -0,0 +1,64 @@
+# Check that one bad line in a batch fails alone.
+#
+# Runs batches against a throwaway vault with malformed lines (JSON that isn't
+# an object, broken JSON, unknown ops) between good `add` requests. Every bad
+# line must get its own {"ok": false} response, and every good add must still
+# be committed; the script exits with status 1 otherwise.
+#
+#   python benchmarks/batch_recovery.py
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PASSWORD = b"batch-password"
+
+BAD_LINES = ("5", '"idea"', '"id"', "[1, 2]", "null", "true", "{not json", '{"op": "fly"}', '{"id": 7, "op": "add"}')
+
+def main():
+    config_home = tempfile.mkdtemp()
+    os.environ["XDG_CONFIG_HOME"] = config_home
+    os.environ["APPDATA"] = config_home
+    sys.path.insert(0, str(ROOT))
+
+    from core.batch import run_batch
+    from core.crypto import derive_new_fernet
+    from core.data import get_many_credentials
+    from core.kdf import KDF_PBKDF2_SHA256
+    from core.records import RecordStore
+    from core.vault import close_vault, get_vault
+
+    params = (1000, 0, 0)
+    fernet, _, salt = derive_new_fernet(PASSWORD, KDF_PBKDF2_SHA256, params)
+    vault = get_vault(fernet)
+    vault.rekey(fernet, KDF_PBKDF2_SHA256, params, salt)
+    vault.save(RecordStore())
+
+    failures = []
+    for i, bad in enumerate(BAD_LINES):
+        before, after = f"before-{i}", f"after-{i}"
+        lines = [json.dumps({"id": "a", "op": "add", "service": before, "username": "me", "password": "pw"}) + "\n",
+                 bad + "\n",
+                 json.dumps({"id": "b", "op": "add", "service": after, "username": "me", "password": "pw"}) + "\n"]
+        responses = []
+        ok = run_batch(fernet, lines, responses.append)
+        responses = [json.loads(response) for response in responses]
+        close_vault()
+        stored = get_many_credentials(fernet, [before, after])
+
+        expected = [{"id": "a", "ok": True, "result": None}, None, {"id": "b", "ok": True, "result": None}]
+        if (ok or len(responses) != 3 or responses[1].get("ok") is not False
+                or [responses[0], responses[2]] != [expected[0], expected[2]] or len(stored) != 2):
+            failures.append(bad)
+            print(f"❗ {bad!r}: responses {responses}, committed {sorted(stored)}", file=sys.stderr)
+
+    if failures:
+        print(f"❗ {len(failures)} of {len(BAD_LINES)} malformed lines broke their batch.", file=sys.stderr)
+        sys.exit(1)
+    print(f"✅ All {len(BAD_LINES)} malformed lines failed alone; every good add was committed.", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
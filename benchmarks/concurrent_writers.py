@@ -0,0 +1,97 @@
+# Stress test: many processes writing to one vault at once.
+#
+# Builds a throwaway vault, then starts --writers processes that each add
+# --entries services. Most edits are single add_service calls (journal
+# appends); every --bulk-every-th one is a transaction too large to journal,
+# which rewrites the snapshot, so appends, compactions and rewrites all race.
+# Half the writers keep their vault cached between edits, like the TUI or the
+# agent; the others start from scratch each time, like separate CLI commands.
+# Afterwards every entry must be in the vault with the right password; the
+# script exits with status 1 if any update was lost.
+#
+#   python benchmarks/concurrent_writers.py [--writers 8] [--entries 200] [--bulk-every 25]
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PASSWORD = b"stress-password"
+
+def writer(worker, entries, bulk_every, key):
+    sys.path.insert(0, str(ROOT))
+    from cryptography.fernet import Fernet
+    from core.data import add_service, transaction
+    from core.journal import JOURNAL_MAX_ENTRIES
+    from core.vault import close_vault
+
+    fernet = Fernet(key)
+    cached = worker % 2 == 0
+    expected = []
+    for i in range(entries):
+        if bulk_every and i % bulk_every == bulk_every - 1:
+            with transaction(fernet) as tx:
+                for j in range(JOURNAL_MAX_ENTRIES + 1):
+                    service = f"bulk-{worker}-{i}-{j}"
+                    tx.put(service, "user", f"password-{service}")
+                    expected.append(service)
+        else:
+            service = f"writer-{worker}-{i}"
+            add_service(fernet, service, "user", f"password-{service}")
+            expected.append(service)
+        if not cached:
+            close_vault()
+    close_vault()
+    return expected
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that concurrent writers never lose an update")
+    parser.add_argument("--writers", type=int, default=8, help="Concurrent writer processes")
+    parser.add_argument("--entries", type=int, default=200, help="Edits per writer")
+    parser.add_argument("--bulk-every", type=int, default=25, help="Make every Nth edit a snapshot-rewriting transaction (0 for never)")
+    args = parser.parse_args()
+
+    config_home = tempfile.mkdtemp()
+    os.environ["XDG_CONFIG_HOME"] = config_home
+    os.environ["APPDATA"] = config_home
+    sys.path.insert(0, str(ROOT))
+
+    from core.crypto import derive_new_fernet
+    from core.data import get_all_credentials
+    from core.kdf import KDF_PBKDF2_SHA256
+    from core.records import RecordStore
+    from core.vault import close_vault, get_vault
+
+    params = (1000, 0, 0)
+    fernet, key, salt = derive_new_fernet(PASSWORD, KDF_PBKDF2_SHA256, params)
+    vault = get_vault(fernet)
+    vault.rekey(fernet, KDF_PBKDF2_SHA256, params, salt)
+    vault.save(RecordStore())
+    close_vault()
+
+    # spawn: each writer is a fresh interpreter, like a separate command
+    context = multiprocessing.get_context("spawn")
+    print(f"⏱️ {args.writers} writers x {args.entries} edits...", file=sys.stderr)
+    start = time.perf_counter()
+    with context.Pool(args.writers) as pool:
+        results = pool.starmap(writer, [(worker, args.entries, args.bulk_every, key) for worker in range(args.writers)])
+    seconds = time.perf_counter() - start
+
+    stored = {service: passwd for service, _, passwd in get_all_credentials(fernet)}
+    expected = [service for result in results for service in result]
+    lost = [service for service in expected if service not in stored]
+    wrong = [service for service in expected if service in stored and stored[service] != f"password-{service}"]
+    edits = args.writers * args.entries
+
+    print(f"{edits} edits ({len(expected)} entries) in {seconds:.2f}s, {edits / seconds:,.0f} edits/s")
+    if lost or wrong:
+        print(f"❗ {len(lost)} entries lost, {len(wrong)} with the wrong password, e.g. {(lost + wrong)[:5]}", file=sys.stderr)
+        sys.exit(1)
+    print(f"✅ All {len(expected)} entries present.", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# I/O benchmark: file opens, stats and mkdirs per vault operation.
+#
+# Counts the filesystem calls each operation makes against a throwaway vault,
+# using an audit hook for opens/mkdirs and a wrapper around os.stat.
+# Each operation runs a few times and the last (warm) run is reported and
+# checked against the counts the caches are meant to achieve; the script exits
+# with status 1 if any operation makes more or fewer calls than expected.
+#
+#   python benchmarks/io_counts.py [--entries N]
+
+import argparse
+import os
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+EVENTS = ("open", "os.stat", "os.mkdir", "os.rename", "os.remove")
+
+# Calls per operation once warm; anything missing is expected to be 0
+EXPECTED = {
+    "load_config": {"os.stat": 1},  # mtime check only
+    "get_data_folder": {"os.stat": 1},
+    "get_salt": {"os.stat": 2},  # No header read while the file is unchanged
+    "get_salt (file changed)": {"open": 1, "os.stat": 3},  # One header read
+    "get (cold vault)": {"open": 2, "os.stat": 2},  # Data file and journal, nothing else
+    "get_services (session)": {"os.stat": 3},  # Stat signature only, no opens
+    "get_credentials (session)": {"os.stat": 3},
+    "add_service": {"open": 3, "os.stat": 9},  # Lock, header check and journal append
+}
+
+counts = Counter()
+counting = False
+
+def audit(event, args):
+    if counting and event in ("open", "os.mkdir", "os.remove", "os.rename"):
+        counts[event] += 1
+
+def counted_stat(stat):
+    def wrapper(*args, **kwargs):
+        if counting:
+            counts["os.stat"] += 1
+        return stat(*args, **kwargs)
+    return wrapper
+
+def measure(fn, runs=3, setup=None):
+    # setup() runs uncounted before each run
+    global counting
+    for _ in range(runs):
+        if setup is not None:
+            setup()
+        counts.clear()
+        counting = True
+        try:
+            fn()
+        finally:
+            counting = False
+    return {event: counts[event] for event in EVENTS}
+
+def main():
+    parser = argparse.ArgumentParser(description="Count filesystem calls per vault operation")
+    parser.add_argument("--entries", type=int, default=1_000)
+    args = parser.parse_args()
+
+    config_home = tempfile.mkdtemp()
+    os.environ["XDG_CONFIG_HOME"] = config_home
+    os.environ["APPDATA"] = config_home
+    os.environ["PYTHON_KEYRING_BACKEND"] = "keyring.backends.null.Keyring"
+    sys.path.insert(0, str(ROOT))
+
+    from cryptography.fernet import Fernet
+    from core import data
+    from core.binary import DATA_FILE
+    from core.config import get_data_folder, load_config
+    from core.crypto import get_salt
+    from core.records import RecordStore
+    from core.vault import Vault
+
+    os.stat = counted_stat(os.stat)
+    sys.addaudithook(audit)
+
+    fernet = Fernet(Fernet.generate_key())
+    get_salt()
+    data.get_vault(fernet).save(RecordStore((f"service-{i}", "user", "password") for i in range(args.entries)))
+    counter = iter(range(10**9))
+    data_path = get_data_folder() / DATA_FILE
+
+    def touch_data_file():
+        # Another process rewrote the vault: same bytes, new mtime
+        mtime = os.stat(data_path).st_mtime_ns + 1_000_000
+        os.utime(data_path, ns=(mtime, mtime))
+
+    operations = {
+        "load_config": (load_config, None),
+        "get_data_folder": (get_data_folder, None),
+        "get_salt": (get_salt, None),
+        "get_salt (file changed)": (get_salt, touch_data_file),
+        "get (cold vault)": (lambda: Vault(fernet).get("service-1"), None),
+        # get_services loads the session's cache, which get_credentials then reuses
+        "get_services (session)": (lambda: data.get_services(fernet), None),
+        "get_credentials (session)": (lambda: data.get_credentials(fernet, "service-1"), None),
+        "add_service": (lambda: data.add_service(fernet, f"new-{next(counter)}", "user", "password"), None),
+    }
+
+    failures = []
+    print(f"{'operation':<28}{'open':>6}{'stat':>6}{'mkdir':>7}{'rename':>8}{'remove':>8}")
+    for name, (fn, setup) in operations.items():
+        result = measure(fn, setup=setup)
+        expected = {event: EXPECTED[name].get(event, 0) for event in EVENTS}
+        mark = "" if result == expected else "  ❗ expected " + " ".join(f"{expected[event]}" for event in EVENTS)
+        print(f"{name:<28}{result['open']:>6}{result['os.stat']:>6}{result['os.mkdir']:>7}"
+              f"{result['os.rename']:>8}{result['os.remove']:>8}{mark}")
+        if result != expected:
+            failures.append(name)
+
+    if failures:
+        print(f"❗ Unexpected filesystem calls in: {', '.join(failures)}", file=sys.stderr)
+        sys.exit(1)
+    print("✅ Every operation made the expected calls.", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
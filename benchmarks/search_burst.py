@@ -0,0 +1,139 @@
+# Benchmark: a burst of superseded searches, as when typing into Search.
+#
+# Builds a vault of --entries services, then sends the prefixes of a query one
+# after another, first straight to AsyncVault.search and then through the TUI
+# Search screen in Textual's headless pilot. Only the last query of a burst
+# should be scored; the others are superseded before they start. Reports the
+# time to the final results next to a single search, and exits with status 1
+# if a superseded query was scored anyway.
+#
+#   python benchmarks/search_burst.py [--entries 50000] [--query service-42]
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PASSWORD = b"benchmark-password"
+
+scored = []
+
+def count_scoring():
+    # Records each query the search index actually scores
+    from core.search import SearchIndex
+
+    score = SearchIndex._score
+    def wrapper(self, query, score_cutoff):
+        scored.append(query)
+        return score(self, query, score_cutoff)
+    SearchIndex._score = wrapper
+
+def build_vault(entries):
+    from core.crypto import derive_new_fernet
+    from core.kdf import KDF_PBKDF2_SHA256
+    from core.records import RecordStore
+    from core.session import save_session_key
+    from core.vault import close_vault, get_vault
+
+    params = (1000, 0, 0)
+    fernet, key, salt = derive_new_fernet(PASSWORD, KDF_PBKDF2_SHA256, params)
+    vault = get_vault(fernet)
+    vault.rekey(fernet, KDF_PBKDF2_SHA256, params, salt)
+    vault.save(RecordStore((f"service-{i}", f"user-{i}@example.com", f"password-{i}") for i in range(entries)))
+    close_vault()
+    save_session_key(key)  # For the TUI run
+    return fernet
+
+async def bench_vault(fernet, prefixes):
+    from core.async_vault import AsyncVault
+
+    vault = AsyncVault(fernet)
+    await vault.search("warm-up")  # Decrypts the vault and builds the index
+
+    # A query the burst doesn't pass through, so neither reuses the other's scores
+    scored.clear()
+    start = time.perf_counter()
+    await vault.search("user-" + prefixes[-1])
+    single = time.perf_counter() - start
+
+    scored.clear()
+    start = time.perf_counter()
+    results = await asyncio.gather(*(vault.search(prefix) for prefix in prefixes))
+    burst = time.perf_counter() - start
+    skipped = sum(1 for result in results[:-1] if result is None)
+    return single, burst, list(scored), skipped, results[-1] is not None
+
+async def bench_tui(prefixes):
+    from textual.widgets import Input
+    from tui.app import LoginApp
+    from tui.screens import EntryList
+
+    app = LoginApp()
+    async with app.run_test(size=(120, 40)) as pilot:
+        while not isinstance(app.screen, EntryList):
+            await pilot.pause()
+        await app.workers.wait_for_complete()
+        app.push_screen("search")
+        await pilot.pause()
+        screen = app.screen
+        field = screen.query_one("#search-input", Input)
+
+        # This app's vault decrypts and indexes on its first search, untimed
+        field.value = "user-" + prefixes[-1]
+        while not screen.table.row_count:
+            await pilot.pause(0.01)
+
+        scored.clear()
+        start = time.perf_counter()
+        for prefix in prefixes:
+            field.value = prefix  # One keystroke each, faster than any search finishes
+        while not scored:
+            await pilot.pause(0.01)
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+        return time.perf_counter() - start, list(scored)
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that superseded searches never get scored")
+    parser.add_argument("--entries", type=int, default=50_000)
+    parser.add_argument("--query", default="service-42", help="Typed one character at a time")
+    parser.add_argument("--skip-tui", action="store_true", help="Leave out the TUI run")
+    args = parser.parse_args()
+
+    config_home = tempfile.mkdtemp()
+    os.environ["XDG_CONFIG_HOME"] = config_home
+    os.environ["APPDATA"] = config_home
+    os.environ["XDG_RUNTIME_DIR"] = tempfile.mkdtemp()
+    os.environ["PM_SESSION_BACKEND"] = "file"
+    os.environ["PYTHON_KEYRING_BACKEND"] = "keyring.backends.null.Keyring"
+    sys.path.insert(0, str(ROOT))
+
+    prefixes = [args.query[:end] for end in range(1, len(args.query) + 1)]
+    print(f"⏱️ {args.entries} entries, typing '{args.query}'...", file=sys.stderr)
+    fernet = build_vault(args.entries)
+    count_scoring()
+
+    failures = []
+    single, burst, queries, skipped, answered = asyncio.run(bench_vault(fernet, prefixes))
+    print(f"AsyncVault: one search {single * 1000:.0f} ms, {len(prefixes)} superseding searches {burst * 1000:.0f} ms, "
+          f"scored {queries}, {skipped} of {len(prefixes) - 1} superseded skipped")
+    if queries != [prefixes[-1]] or skipped != len(prefixes) - 1 or not answered:
+        failures.append("AsyncVault")
+
+    if not args.skip_tui:
+        seconds, queries = asyncio.run(bench_tui(prefixes))
+        print(f"TUI Search: {len(prefixes)} keystrokes to final results {seconds * 1000:.0f} ms, scored {queries}")
+        if queries != [prefixes[-1]]:
+            failures.append("TUI Search")
+
+    if failures:
+        print(f"❗ Superseded queries were scored in: {', '.join(failures)}", file=sys.stderr)
+        sys.exit(1)
+    print("✅ Only the last query of each burst was scored.", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# Consistency check for the incremental search index.
+#
+# Types each query one character at a time into one long-lived SearchIndex,
+# the way the TUI Search screen does, with entries added and removed along
+# the way. After every keystroke and edit the results must equal a search
+# on a freshly built index. The script exits with status 1 on any mismatch.
+#
+#   python benchmarks/search_consistency.py [--services 2000] [--queries 200] [--seed 1]
+
+import argparse
+import random
+import string
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+WORDS = ("google", "gitlab", "github", "yahoo", "facebook", "digital", "ocean", "amazon", "apple", "bank",
+         "mail", "cloud", "router", "netflix", "spotify", "steam", "discord", "reddit", "paypal", "work")
+
+def random_service(rng):
+    name = rng.choice(WORDS)
+    if rng.random() < 0.5:
+        name += rng.choice(("", "-", ".", " ")) + rng.choice(WORDS)
+    if rng.random() < 0.3:
+        name += str(rng.randrange(100))
+    return name
+
+def random_username(rng):
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) + rng.choice(("", "@mail.com", "@work.org"))
+
+def random_query(rng):
+    if rng.random() < 0.7:
+        query = rng.choice(WORDS)
+        return query[:rng.randint(1, len(query))] + ("".join(rng.choices(string.ascii_lowercase, k=rng.randint(0, 3))))
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(1, 8)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that incremental search results equal a full search")
+    parser.add_argument("--services", type=int, default=2000, help="Entries in the index")
+    parser.add_argument("--queries", type=int, default=200, help="Queries to type")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    from core.search import SearchIndex
+
+    rng = random.Random(args.seed)
+    rows = {}
+    while len(rows) < args.services:
+        rows[f"{random_service(rng)} {len(rows)}"] = random_username(rng)
+    index = SearchIndex(rows.items())
+
+    checks = mismatches = 0
+    for _ in range(args.queries):
+        query = random_query(rng)
+        for end in range(1, len(query) + 1):
+            # Now and then the vault changes under an open search
+            if rng.random() < 0.1:
+                service = f"{random_service(rng)} new{checks}"
+                rows[service] = random_username(rng)
+                index.add(service, rows[service])
+            if rng.random() < 0.1 and rows:
+                service = rng.choice(list(rows))
+                del rows[service]
+                index.remove(service)
+
+            prefix = query[:end]
+            limit = rng.choice((5, 20))
+            got = index.search(prefix, limit=limit)
+            expected = SearchIndex(rows.items()).search(prefix, limit=limit)
+            checks += 1
+            if got != expected:
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"❗ '{prefix}': incremental {got} != full {expected}", file=sys.stderr)
+
+    if mismatches:
+        print(f"❗ {mismatches} of {checks} searches differed from a full search.", file=sys.stderr)
+        sys.exit(1)
+    print(f"✅ All {checks} incremental searches matched a full search.", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
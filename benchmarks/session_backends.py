@@ -0,0 +1,68 @@
+# Session backend benchmark: latency of saving and loading the session key.
+#
+# For each backend, times save_session_key, a cold load_session_key (a new
+# process's first read, which goes to the backend) and a warm one (answered
+# from the in-process cache). Uses a throwaway config, a private runtime folder
+# and its own keyring entry, so a real session is left alone.
+#
+#   python benchmarks/session_backends.py [--runs N] [--backends keyring file memory]
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description="Time session key save/load per backend")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--backends", nargs="+", default=["keyring", "file", "memory"])
+    args = parser.parse_args()
+
+    config_home = tempfile.mkdtemp()
+    os.environ["XDG_CONFIG_HOME"] = config_home
+    os.environ["APPDATA"] = config_home
+    shm = os.environ.get("XDG_RUNTIME_DIR") or ("/dev/shm" if os.path.isdir("/dev/shm") else None)
+    os.environ["XDG_RUNTIME_DIR"] = tempfile.mkdtemp(dir=shm)
+    sys.path.insert(0, str(ROOT))
+
+    from core import session
+
+    session.SESSION_SERVICE = "password_manager_session_benchmark"
+    key = os.urandom(32)
+
+    def cold_load():
+        session._session_cache = None
+        assert session.load_session_key() == key
+
+    print(f"{'backend':<10}{'save':>12}{'cold load':>12}{'warm load':>12}")
+    for name in args.backends:
+        os.environ["PM_SESSION_BACKEND"] = name
+        try:
+            save = timed(lambda: session.save_session_key(key), args.runs)
+            cold = timed(cold_load, args.runs)
+            warm = timed(session.load_session_key, args.runs)
+        except Exception as e:
+            print(f"{name:<10}unavailable: {e}")
+            continue
+        finally:
+            try:
+                session.lock_session()
+            except Exception:
+                pass
+        print(f"{name:<10}{save * 1e3:>10.3f}ms{cold * 1e3:>10.3f}ms{warm * 1e3:>10.3f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# Startup benchmark: import cost of each CLI command.
+#
+# Every command runs in a fresh interpreter under `python -X importtime`
+# against a throwaway config directory (and the null keyring backend, so the
+# real session is never touched). Reports wall time and total import time,
+# plus the heaviest top-level imports.
+#
+#   python benchmarks/startup.py [--repeat N] [--json]
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MAIN = ROOT / "main.py"
+PASSWORD = "benchmark-password"
+
+# (name, argv, stdin)
+COMMANDS = [
+    ("help", ["help"], ""),
+    ("lock", ["lock"], ""),
+    ("config", ["config", "--set-dir", ".dat/"], ""),
+    ("list", ["list"], f"{PASSWORD}\n"),
+    ("get", ["get", "example"], f"{PASSWORD}\n"),
+    ("search", ["search", "exa"], f"{PASSWORD}\n"),
+    ("add", ["add", "example", "user"], f"{PASSWORD}\nsecret\n"),
+]
+
+def make_env(config_home):
+    env = dict(os.environ)
+    env["XDG_CONFIG_HOME"] = config_home  # Linux
+    env["APPDATA"] = config_home  # Windows
+    env["PYTHON_KEYRING_BACKEND"] = "keyring.backends.null.Keyring"
+    return env
+
+def run(argv, stdin, env, importtime=False):
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += [str(MAIN), *argv]
+
+    start = time.perf_counter()
+    # A new session has no controlling tty, so getpass falls back to stdin
+    proc = subprocess.run(cmd, input=stdin, env=env, cwd=ROOT, capture_output=True,
+                          text=True, start_new_session=True)
+    elapsed = time.perf_counter() - start
+    return elapsed, proc.stderr
+
+def parse_importtime(stderr):
+    # "import time: self [us] | cumulative | imported package"; nesting is shown
+    # by indentation, so unindented names are the top-level imports
+    top_level = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):
+            top_level.append((name.strip(), int(cumulative)))
+    return top_level
+
+def bench_command(argv, stdin, env, repeat):
+    best_wall = None
+    best_imports = None
+    for _ in range(repeat):
+        wall, _ = run(argv, stdin, env)
+        _, stderr = run(argv, stdin, env, importtime=True)
+        imports = parse_importtime(stderr)
+        if best_wall is None or wall < best_wall:
+            best_wall = wall
+        if best_imports is None or sum(c for _, c in imports) < sum(c for _, c in best_imports):
+            best_imports = imports
+
+    heaviest = sorted(best_imports, key=lambda x: x[1], reverse=True)[:5]
+    return {
+        "wall_ms": round(best_wall * 1000, 1),
+        "import_ms": round(sum(c for _, c in best_imports) / 1000, 1),
+        "heaviest": [{"module": name, "ms": round(c / 1000, 1)} for name, c in heaviest],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure CLI startup and import cost per command")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per command (best is kept)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as config_home:
+        env = make_env(config_home)
+        run(["setup"], f"{PASSWORD}\n{PASSWORD}\n", env)
+
+        results = {name: bench_command(argv, stdin, env, args.repeat) for name, argv, stdin in COMMANDS}
+
+    if args.json:
+        print(json.dumps(results, indent=4))
+        return
+
+    print(f"{'command':<10}{'wall ms':>10}{'import ms':>12}  heaviest imports")
+    for name, result in results.items():
+        heaviest = ", ".join(f"{h['module']} {h['ms']}" for h in result["heaviest"][:3])
+        print(f"{name:<10}{result['wall_ms']:>10}{result['import_ms']:>12}  {heaviest}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# Benchmark suite: core operations on synthetic vaults of several sizes.
+#
+# Builds a vault per size in a throwaway config directory, locked with a cheap
+# PBKDF2 cost so runs stay quick, and times unlock, get_credentials,
+# get_services, add_service, remove_service, a CLI `search` in a fresh
+# interpreter and the TUI EntryList (mount, refresh, cursor movement) through
+# Textual's headless pilot. Results are written as JSON; --compare checks them
+# against an earlier run and exits with status 1 if anything got slower.
+#
+#   python benchmarks/suite.py [--sizes 100 10000 100000] [--iterations N] [--output results.json]
+#   python benchmarks/suite.py --compare baseline.json [--threshold 0.25]
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MAIN = ROOT / "main.py"
+PASSWORD = b"benchmark-password"
+
+def timed(fn, repeat, setup=None):
+    # Median milliseconds over repeat runs; setup() runs untimed before each one
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return round(statistics.median(samples) * 1000, 3)
+
+async def timed_async(fn, repeat, setup=None):
+    # timed() for coroutine functions
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return round(statistics.median(samples) * 1000, 3)
+
+def build_vault(size, iterations):
+    from core.config import load_config, save_config
+    from core.crypto import derive_new_fernet
+    from core.kdf import KDF_PBKDF2_SHA256
+    from core.records import RecordStore
+    from core.session import save_session_key
+    from core.vault import close_vault, get_vault
+
+    config = load_config()
+    config["storage_dir"] = f"vault-{size}"
+    save_config(config)
+
+    close_vault()
+    params = (iterations, 0, 0)
+    fernet, key, salt = derive_new_fernet(PASSWORD, KDF_PBKDF2_SHA256, params)
+    vault = get_vault(fernet)
+    vault.rekey(fernet, KDF_PBKDF2_SHA256, params, salt)  # Empty vault with this KDF and salt
+    vault.save(RecordStore((f"service-{i}", f"user-{i}@example.com", f"password-{i}") for i in range(size)))
+    close_vault()
+    # The CLI and TUI runs pick the key up from the file session backend
+    save_session_key(key)
+
+def bench_core(size, repeat):
+    from core import crypto, data
+    from core.vault import close_vault
+
+    target = f"service-{size // 2}"
+    fernet, _ = crypto.unlock(PASSWORD)
+    results = {
+        "unlock_ms": timed(lambda: crypto.unlock(PASSWORD), repeat, setup=close_vault),
+        "get_cold_ms": timed(lambda: data.get_credentials(fernet, target), repeat, setup=close_vault),
+        "services_cold_ms": timed(lambda: data.get_services(fernet), repeat, setup=close_vault),
+    }
+
+    data.get_services(fernet)  # Warm the session's cache
+    results["get_warm_ms"] = timed(lambda: data.get_credentials(fernet, target), repeat)
+    results["services_warm_ms"] = timed(lambda: data.get_services(fernet), repeat)
+
+    counter = iter(range(10**9))
+    added = []
+    def add():
+        service = f"added-{next(counter)}"
+        data.add_service(fernet, service, "user", "password")
+        added.append(service)
+    results["add_ms"] = timed(add, repeat)
+    results["remove_ms"] = timed(lambda: data.remove_service(fernet, added.pop()), repeat)
+    close_vault()
+    return results
+
+def bench_cli_search(repeat):
+    env = dict(os.environ)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(MAIN), "search", "service-4"], env=env, cwd=ROOT,
+                       stdin=subprocess.DEVNULL, capture_output=True, check=True)
+        samples.append(time.perf_counter() - start)
+    return {"cli_search_ms": round(statistics.median(samples) * 1000, 3)}
+
+async def bench_tui(repeat):
+    from core.data import add_service
+    from tui.app import LoginApp
+    from tui.screens import EntryList
+
+    app = LoginApp()
+    start = time.perf_counter()
+    async with app.run_test(size=(120, 40)) as pilot:
+        while not isinstance(app.screen, EntryList):
+            await pilot.pause()
+        await app.workers.wait_for_complete()  # The first refresh
+        await pilot.pause()
+        results = {"tui_mount_ms": round((time.perf_counter() - start) * 1000, 3)}
+
+        screen = app.screen
+        results["tui_refresh_ms"] = await timed_async(screen._refresh_table, repeat)
+
+        counter = iter(range(10**9))
+        results["tui_refresh_edit_ms"] = await timed_async(
+            screen._refresh_table, repeat,
+            setup=lambda: add_service(app.fernet, f"tui-{next(counter)}", "user", "password"))
+
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await pilot.press("j")
+            samples.append(time.perf_counter() - start)
+        results["tui_cursor_ms"] = round(statistics.median(samples) * 1000, 3)
+    return results
+
+def compare(results, baseline, threshold, min_ms):
+    # Prints every shared metric; returns the regressions
+    regressions = []
+    print(f"{'size':>8}  {'metric':<22}{'baseline':>12}{'current':>12}{'change':>9}")
+    for size, metrics in results["results"].items():
+        for metric, value in metrics.items():
+            base = baseline.get("results", {}).get(size, {}).get(metric)
+            if base is None or not metric.endswith("_ms"):
+                continue
+            change = (value - base) / base if base else 0
+            flag = ""
+            if change > threshold and value - base > min_ms:
+                flag = "  ❗ slower"
+                regressions.append((size, metric, base, value))
+            print(f"{size:>8}  {metric:<22}{base:>12.3f}{value:>12.3f}{change:>+9.0%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark core operations on synthetic vaults")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--iterations", type=int, default=10_000, help="PBKDF2 iterations of the synthetic vaults")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (median is kept)")
+    parser.add_argument("--skip-tui", action="store_true", help="Leave out the TUI measurements")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to check the results against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative slowdown counted as a regression")
+    parser.add_argument("--min-ms", type=float, default=1.0, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    config_home = tempfile.mkdtemp()
+    os.environ["XDG_CONFIG_HOME"] = config_home
+    os.environ["APPDATA"] = config_home
+    os.environ["XDG_RUNTIME_DIR"] = tempfile.mkdtemp()
+    os.environ["PM_SESSION_BACKEND"] = "file"
+    os.environ["PYTHON_KEYRING_BACKEND"] = "keyring.backends.null.Keyring"
+    sys.path.insert(0, str(ROOT))
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "repeat": args.repeat,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": {},
+    }
+    for size in args.sizes:
+        print(f"⏱️ {size} entries...", file=sys.stderr)
+        start = time.perf_counter()
+        build_vault(size, args.iterations)
+        metrics = {"build_s": round(time.perf_counter() - start, 2)}
+        metrics.update(bench_core(size, args.repeat))
+        metrics.update(bench_cli_search(args.repeat))
+        if not args.skip_tui:
+            metrics.update(asyncio.run(bench_tui(args.repeat)))
+        results["results"][str(size)] = metrics
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=4), encoding="utf-8")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold, args.min_ms)
+        if regressions:
+            print(f"❗ {len(regressions)} regressions over {args.threshold:.0%}", file=sys.stderr)
+            sys.exit(1)
+        print("✅ No regressions.", file=sys.stderr)
+    elif not args.output:
+        print(json.dumps(results, indent=4))
+
+if __name__ == "__main__":
+    main()
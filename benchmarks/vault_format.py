@@ -0,0 +1,62 @@
+# Vault format benchmark: cold `get` latency for version 1 and version 2 files.
+#
+# Builds synthetic vaults of increasing size in a throwaway config directory and
+# times a fresh lookup of one credential, the way a single CLI `get` does it.
+# The key is random, so no KDF time is included.
+#
+#   python benchmarks/vault_format.py [--sizes 100 1000 10000] [--repeat N]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+    return round(best * 1000, 2)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cold get latency of vault file formats")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 50_000])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is kept)")
+    args = parser.parse_args()
+
+    config_home = tempfile.mkdtemp()
+    os.environ["XDG_CONFIG_HOME"] = config_home
+    os.environ["APPDATA"] = config_home
+    sys.path.insert(0, str(ROOT))
+
+    from cryptography.fernet import Fernet
+    from core.crypto import get_salt, get_data_file, write_data_file
+    from core.records import RecordStore, parse_csv
+    from core.vault import Vault
+
+    fernet = Fernet(Fernet.generate_key())
+    get_salt()
+
+    print(f"{'entries':>8}{'v1 get ms':>12}{'v2 get ms':>12}{'file kB':>10}")
+    for size in args.sizes:
+        store = RecordStore((f"service-{i}", f"user-{i}", f"password-{i}") for i in range(size))
+        target = f"service-{size // 2}"
+
+        write_data_file(fernet, store.to_csv())
+        v1 = timed(lambda: parse_csv(get_data_file(fernet)).get(target), args.repeat)
+
+        Vault(fernet).save(store)
+        v2 = timed(lambda: Vault(fernet).get(target), args.repeat)
+
+        size_kb = (Path(config_home) / "PasswordManager").rglob("data")
+        kb = round(sum(p.stat().st_size for p in size_kb) / 1024)
+        print(f"{size:>8}{v1:>12}{v2:>12}{kb:>10}")
+
+if __name__ == "__main__":
+    main()
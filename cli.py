@@ -3,6 +3,9 @@ import argparse
 parser = argparse.ArgumentParser(description="🔐 Simple Encrypted Password Manager")
 
 def parse_args():
+    parser.add_argument("--profile", metavar="FILE", help="Write a Chrome trace of where the time went to FILE")
+    parser.add_argument("--cprofile", metavar="FILE", help="With --profile, also write a cProfile dump to FILE")
+
     subparsers = parser.add_subparsers(dest="command")
 
     # Add command
@@ -16,7 +19,8 @@ def parse_args():
 
     # Get command
     get_parser = subparsers.add_parser("get", help="Retrieve credentials for a service")
-    get_parser.add_argument("service", help="Service name")
+    get_parser.add_argument("service", nargs="+", help="Service name(s)")
+    get_parser.add_argument("--json", action="store_true", help="Print one JSON object per service")
 
     # List command
     subparsers.add_parser("list", help="List all stored services")
@@ -25,18 +29,72 @@ def parse_args():
     search_parser = subparsers.add_parser("search", help="Search through available services")
     search_parser.add_argument("query", help="What to search for")
     
+    # Import command
+    import_parser = subparsers.add_parser("import", help="Import credentials from a CSV or JSON export")
+    import_parser.add_argument("file", help="File to import, or - for stdin")
+    import_parser.add_argument("--format", choices=["csv", "json", "jsonl"], help="File format (default: from the file extension)")
+    import_parser.add_argument("--overwrite", action="store_true", help="Replace passwords of accounts already in the vault")
+    import_parser.add_argument("--dry-run", action="store_true", help="Check the file without changing the vault")
+
+    # Export command
+    export_parser = subparsers.add_parser("export", help="Export credentials as CSV or JSON Lines")
+    export_parser.add_argument("file", nargs="?", default="-", help="File to write, or - for stdout (default)")
+    export_parser.add_argument("--format", choices=["csv", "jsonl"], default="csv", help="Output format (default: csv)")
+    export_parser.add_argument("--encrypt", action="store_true", help="Encrypt the export under a separate passphrase")
+
+    # Generate command
+    classes = ["upper", "lower", "digits", "symbols"]
+    generate_parser = subparsers.add_parser("generate", help="Generate random passwords or passphrases")
+    generate_parser.add_argument("-n", "--count", type=int, default=1, help="How many to generate (default: 1)")
+    generate_parser.add_argument("-l", "--length", type=int, default=16, help="Characters per password (default: 16)")
+    generate_parser.add_argument("--classes", nargs="+", choices=classes, default=classes, help="Character classes to draw from (default: all)")
+    generate_parser.add_argument("--require", nargs="*", choices=classes, help="Classes each password must contain (default: every class drawn from)")
+    generate_parser.add_argument("--no-look-alikes", action="store_true", help="Leave out characters that are easily misread (Il1|O0o`')")
+    generate_parser.add_argument("--exclude", default="", help="Characters to leave out")
+    generate_parser.add_argument("--words", type=int, default=0, help="Generate passphrases of this many words instead")
+    generate_parser.add_argument("--wordlist", help="Word file for passphrases, one word per line (diceware lists work too)")
+    generate_parser.add_argument("--separator", default="-", help="Between passphrase words (default: -)")
+    generate_parser.add_argument("--entropy", type=float, help="Pick the shortest length (or word count) with at least this many bits")
+
+    # Audit command
+    audit_parser = subparsers.add_parser("audit", help="Report reused, similar, weak and short passwords")
+    audit_parser.add_argument("--min-length", type=int, default=12, help="Passwords shorter than this are reported (default: 12)")
+    audit_parser.add_argument("--all", action="store_true", help="List every entry's strength, not only the ones with issues")
+    audit_parser.add_argument("--json", action="store_true", help="Print one JSON object per entry")
+    audit_parser.add_argument("--workers", type=int, help="Processes to score passwords with (default: one per core)")
+
+    # Breach check command
+    breach_parser = subparsers.add_parser("breach-check", help="Look up every stored password in an offline breach corpus")
+    breach_parser.add_argument("--corpus", help="Sorted SHA-1 corpus (HASH:COUNT lines); defaults to the configured one")
+
+    # Batch command
+    subparsers.add_parser("batch", help="Run JSON requests from stdin, one per line, under a single unlock")
+
     #Lock command
     subparsers.add_parser("lock", help="Manually clear the unlocked session (like sudo -k)")
 
     # Setup command
     subparsers.add_parser("setup", help="Initialize the password manager vault") 
 
+    # KDF benchmark command
+    kdf_parser = subparsers.add_parser("kdf-benchmark", help="Measure key derivation cost and tune the vault's unlock time")
+    kdf_parser.add_argument("--target-ms", type=int, default=500, help="Unlock time to calibrate for (default: 500)")
+    kdf_parser.add_argument("--rekey", choices=["pbkdf2-sha256", "scrypt"], help="Re-encrypt the vault with the recommended settings")
+
+    # Agent command
+    agent_parser = subparsers.add_parser("agent", help="Keep the vault unlocked in a background agent for faster commands")
+    agent_parser.add_argument("--foreground", action="store_true", help="Run in the foreground instead of detaching")
+    agent_parser.add_argument("--stop", action="store_true", help="Stop the running agent")
+
     # Help command
     subparsers.add_parser("help", help="Show this help message")
 
     # Config command
     config_parser = subparsers.add_parser("config", help="Manage configuration")
     config_parser.add_argument("--set-dir", help="Set custom data storage directory")
+    config_parser.add_argument("--session-backend", choices=["keyring", "file", "memory"], help="Where the unlocked session key is kept")
+    config_parser.add_argument("--sliding-session", choices=["on", "off"], help="Extend the session each time it is used")
+    config_parser.add_argument("--breach-corpus", metavar="PATH", help="Breach corpus checked when adding passwords (\"\" to clear)")
 
     return parser.parse_args()
 
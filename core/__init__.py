@@ -1 +1,9 @@
-from . import binary, config, crypto, data, session
\ No newline at end of file
+import importlib
+
+__all__ = ["agent", "async_vault", "audit", "binary", "breach", "config", "crypto", "data", "generator", "journal", "kdf", "records", "search", "session", "trace", "vault", "vaultfile"]
+
+def __getattr__(name):
+    # Submodules load on first use, so `from core.session import ...` doesn't drag in pandas
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
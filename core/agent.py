@@ -0,0 +1,201 @@
+###################
+## AGENT METHODS ##
+###################
+
+# An ssh-agent style daemon: it holds the unlocked vault for SESSION_DURATION
+# and answers get/list/search/add over a Unix socket only its owner can open.
+# Requests and replies are one JSON object per line.
+
+import json
+import os
+import socket
+import socketserver
+import struct
+import time
+from pathlib import Path
+
+from core.config import get_data_folder, get_runtime_folder
+from core.session import SESSION_DURATION
+
+AGENT_SOCKET = "agent.sock"
+CONNECT_TIMEOUT = 2  # seconds
+REQUEST_TIMEOUT = 30  # seconds
+POLL_INTERVAL = 0.5  # seconds between expiry checks
+
+class AgentError(RuntimeError):
+    pass
+
+def agent_supported() -> bool:
+    return hasattr(socket, "AF_UNIX") and hasattr(os, "getuid")
+
+def get_socket_path() -> Path:
+    return get_runtime_folder() / AGENT_SOCKET
+
+def _peer_uid(sock) -> int | None:
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None  # Not available here; the folder permissions still apply
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    _, uid, _ = struct.unpack("3i", creds)
+    return uid
+
+class _AgentHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        uid = _peer_uid(self.connection)
+        if uid is not None and uid != os.getuid():
+            return
+        for line in self.rfile:
+            try:
+                reply = {"ok": True, "result": self.server.dispatch(json.loads(line))}
+            except Exception as e:
+                reply = {"ok": False, "error": str(e)}
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+class _AgentServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, fernet, duration):
+        self.fernet = fernet
+        self.path = str(get_data_folder())
+        self.expires = time.monotonic() + duration
+        self.stopped = False
+        super().__init__(path, _AgentHandler)
+
+    def dispatch(self, request: dict):
+        from core import data
+
+        op = request.get("op")
+        if op == "ping":
+            return {"path": self.path, "expires_in": self.expires - time.monotonic()}
+        if op == "get":
+            return list(data.get_credentials(self.fernet, request["service"]))
+        if op == "list":
+            return data.get_services(self.fernet)
+        if op == "search":
+            return data.search_services(self.fernet, request["query"],
+                                        limit=request.get("limit", 5),
+                                        score_cutoff=request.get("score_cutoff", 60))
+        if op == "add":
+            data.add_service(self.fernet, request["service"], request["usrname"], request["passwd"])
+            return None
+        if op == "stop":
+            self.stopped = True
+            return None
+        raise AgentError(f"Unknown agent request '{op}'")
+
+def run_agent(fernet, duration=SESSION_DURATION):
+    # Serves until the session window closes or a client asks it to stop
+    path = get_socket_path()
+    if path.exists() or path.is_symlink():
+        if connect_agent(check_vault=False) is not None:
+            raise AgentError("An agent is already running")
+        path.unlink()  # Left behind by an agent that didn't exit cleanly
+
+    old_umask = os.umask(0o177)  # Socket is created 0600
+    try:
+        server = _AgentServer(str(path), fernet, duration)
+    finally:
+        os.umask(old_umask)
+
+    server.timeout = POLL_INTERVAL
+    try:
+        with server:
+            while not server.stopped and time.monotonic() < server.expires:
+                server.handle_request()
+    finally:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        from core.vault import close_vault
+        close_vault()
+
+def daemonize():
+    # Returns True in the detached child, False in the parent
+    if os.fork():
+        return False
+    os.setsid()
+    if os.fork():
+        os._exit(0)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.close(devnull)
+    return True
+
+class AgentClient:
+    def __init__(self, sock):
+        self._sock = sock
+        self._file = sock.makefile("rwb")
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+    def request(self, op: str, **args):
+        try:
+            self._file.write(json.dumps({"op": op, **args}).encode("utf-8") + b"\n")
+            self._file.flush()
+            line = self._file.readline()
+        except OSError as e:
+            raise AgentError(f"Agent connection failed: {e}") from e
+        if not line:
+            raise AgentError("Agent closed the connection")
+        reply = json.loads(line)
+        if not reply.get("ok"):
+            raise AgentError(reply.get("error", "Agent request failed"))
+        return reply.get("result")
+
+    def get_credentials(self, service: str):
+        usrname, passwd = self.request("get", service=service)
+        return usrname, passwd
+
+    def get_services(self):
+        return self.request("list")
+
+    def search_services(self, query: str, limit=5, score_cutoff=60):
+        return [tuple(match) for match in
+                self.request("search", query=query, limit=limit, score_cutoff=score_cutoff)]
+
+    def add_service(self, service: str, usrname: str, passwd: str):
+        self.request("add", service=service, usrname=usrname, passwd=passwd)
+
+def connect_agent(check_vault=True) -> AgentClient | None:
+    # None when no agent is running (or it serves a different vault),
+    # so callers can fall back to unlocking the vault themselves
+    if not agent_supported():
+        return None
+    try:
+        path = get_socket_path()
+    except OSError:
+        return None
+    if not path.exists():
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(str(path))
+        client = AgentClient(sock)
+        status = client.request("ping")
+        sock.settimeout(REQUEST_TIMEOUT)
+    except (OSError, AgentError, ValueError):
+        sock.close()
+        return None
+
+    if check_vault and status.get("path") != str(get_data_folder()):
+        client.close()
+        return None
+    return client
+
+def stop_agent() -> bool:
+    client = connect_agent(check_vault=False)
+    if client is None:
+        return False
+    try:
+        client.request("stop")
+    except AgentError:
+        pass
+    finally:
+        client.close()
+    return True
@@ -0,0 +1,152 @@
+#########################
+## ASYNC VAULT METHODS ##
+#########################
+
+# Awaitable wrapper over core.data for asyncio code such as the Textual app.
+# Every call runs in a thread pool, so the event loop never waits on the KDF,
+# the keyring, disk I/O or Fernet. Reads that are already in flight are
+# shared: a second identical read awaits the first one's result instead of
+# decrypting the same records again. A write stops later reads from joining
+# reads that started before it, so nobody is handed data older than their
+# own edits. Searches are never shared: each one supersedes those before it,
+# and a superseded search that hasn't started scoring yet doesn't.
+
+import asyncio
+import functools
+import threading
+
+from core import data
+
+class AsyncVault:
+    def __init__(self, fernet, executor=None):
+        self.fernet = fernet
+        self._executor = executor  # None uses the event loop's default pool
+        self._inflight = {}  # read key -> future
+        self._search_generation = 0
+        self._search_lock = threading.Lock()
+
+    @classmethod
+    async def resume(cls, executor=None):
+        # The vault of a saved session, or None if there isn't one
+        from core.crypto import get_fernet
+
+        try:
+            fernet = await _run(executor, get_fernet)
+        except ValueError:
+            return None
+        return cls(fernet, executor)
+
+    @classmethod
+    async def unlock(cls, password: bytes, remember=False, executor=None):
+        # None if the password doesn't open the vault
+        unlocked = await _run(executor, _unlock, password, remember)
+        return cls(unlocked, executor) if unlocked is not None else None
+
+    @classmethod
+    async def create(cls, password: bytes, executor=None):
+        # A new empty vault under this password, remembered as the session
+        return cls(await _run(executor, _create, password), executor)
+
+    async def call(self, fn, *args):
+        # Any other blocking call, off the event loop and never shared
+        return await _run(self._executor, fn, *args)
+
+    async def _read(self, key, fn, *args):
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(_run(self._executor, fn, self.fernet, *args))
+            self._inflight[key] = future
+            future.add_done_callback(functools.partial(self._forget, key))
+        # One cancelled caller mustn't cancel the read for everyone else
+        return await asyncio.shield(future)
+
+    def _forget(self, key, future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    async def _write(self, fn, *args):
+        self._inflight.clear()
+        return await _run(self._executor, fn, self.fernet, *args)
+
+    async def all_credentials(self) -> list:
+        return await self._read(("all",), data.get_all_credentials)
+
+    async def credentials(self, service: str):
+        return await self._read(("get", service), data.get_credentials, service)
+
+    async def many_credentials(self, services) -> dict:
+        services = tuple(services)
+        return await self._read(("many", services), data.get_many_credentials, services)
+
+    async def accounts(self) -> set:
+        return await self._read(("accounts",), data.get_accounts)
+
+    async def services(self) -> list:
+        return await self._read(("services",), data.get_services)
+
+    def search(self, query: str, limit=5, score_cutoff=60):
+        # Awaitable list of (service, score), or None if a later search() call
+        # superseded this one before it began. Not a coroutine function: the
+        # generation moves on when search() is called, so of a burst of calls
+        # only the last one scores, however the awaits are scheduled.
+        self._search_generation += 1
+        return _run(self._executor, self._search, self._search_generation, query, limit, score_cutoff)
+
+    def _search(self, generation, query, limit, score_cutoff):
+        # One search at a time in the pool; those overtaken while they waited drop out
+        with self._search_lock:
+            if generation != self._search_generation:
+                return None
+            return data.search_services(self.fernet, query, limit, score_cutoff)
+
+    async def add(self, service: str, usrname: str, passwd: str):
+        await self._write(data.add_service, service, usrname, passwd)
+
+    async def remove(self, service: str, usrname: str | None = None):
+        await self._write(data.remove_service, service, usrname)
+
+    async def transact(self, edit):
+        # edit(tx) runs inside one transaction, in the pool
+        await self._write(_transact, edit)
+
+    async def lock(self):
+        # Ends the session: the saved key and the cached vault are both dropped
+        self._inflight.clear()
+        await _run(self._executor, _lock)
+
+async def _run(executor, fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(executor, functools.partial(fn, *args))
+
+def _unlock(password: bytes, remember: bool):
+    from core.crypto import unlock
+    from core.session import save_session_key
+    from core.vault import get_vault
+
+    unlocked = unlock(password)  # The only key derivation of this unlock
+    if unlocked is None:
+        return None
+    fernet, key = unlocked
+    if remember:
+        save_session_key(key)
+    get_vault(fernet).records()  # Decrypt now, while the UI shows progress
+    return fernet
+
+def _create(password: bytes):
+    from core.crypto import derive_fernet
+    from core.session import save_session_key
+
+    fernet, key = derive_fernet(password)
+    save_session_key(key)
+    data.create_empty_vault(fernet)
+    return fernet
+
+def _transact(fernet, edit):
+    with data.transaction(fernet) as tx:
+        edit(tx)
+
+def _lock():
+    from core.session import lock_session
+    from core.vault import close_vault
+
+    lock_session()
+    close_vault()
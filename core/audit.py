@@ -0,0 +1,177 @@
+###################
+## AUDIT METHODS ##
+###################
+
+# Vault-wide password audit. Every password is decrypted once, through
+# core.data, and then only handled in these forms:
+#
+#   - a keyed BLAKE2b digest, grouping entries that share a password. The key
+#     is random per audit, so the index is useless once the audit ends.
+#   - a keyed digest of its "skeleton" (case folded, leetspeak undone, digits
+#     and symbols dropped), grouping near-duplicates like Summer2023! / summer24
+#   - a strength estimate, computed once per distinct password and spread
+#     over several processes for large vaults
+#
+# Both groupings are single passes over the vault, with no pairwise comparison.
+
+import hashlib
+import math
+import os
+import string
+import time
+from typing import NamedTuple
+
+from core.data import get_all_credentials
+
+MIN_LENGTH = 12
+MIN_SKELETON = 4  # Shorter skeletons say too little to call two passwords alike
+PARALLEL_THRESHOLD = 5000  # Distinct passwords before scoring is spread over processes
+
+# Bits of estimated entropy for each score
+SCORES = ("very weak", "weak", "fair", "strong", "very strong")
+SCORE_BITS = (0, 28, 36, 60, 80)
+
+LEET = str.maketrans("0134578@$!|", "oleastbasii")
+
+# Passwords (and skeletons) that guessing tools try first
+COMMON = frozenset("""
+password passwd passw0rd qwerty qwertyuiop asdf asdfgh asdfghjkl zxcvbn letmein welcome
+admin administrator root login master monkey dragon shadow sunshine princess football
+baseball soccer hockey superman batman trustno iloveyou hello hunter killer freedom
+whatever secret changeme default guest test abc abcdef abcdefg
+""".split())
+
+class EntryAudit(NamedTuple):
+    service: str
+    usrname: str
+    length: int
+    bits: float
+    score: int  # Index into SCORES
+    issues: tuple  # Some of "reused", "similar", "common", "weak", "short"
+
+class AuditReport(NamedTuple):
+    entries: list  # EntryAudit in vault order
+    reused: list  # Groups of (service, usrname) sharing one password
+    similar: list  # Groups with different passwords of the same skeleton
+    seconds: float
+
+CLASS_POOLS = tuple((frozenset(chars), len(chars)) for chars in (
+    string.ascii_lowercase, string.ascii_uppercase, string.digits, string.punctuation))
+ENDS = string.digits + string.punctuation + string.whitespace
+
+def skeleton(password: str) -> str:
+    # Digits and symbols at the ends are usually a counter or a padding rule, inside a word leetspeak
+    return "".join(filter(str.isalpha, password.casefold().strip(ENDS).translate(LEET)))
+
+def is_common(password: str, shape: str | None = None) -> bool:
+    return password.casefold() in COMMON or (shape if shape is not None else skeleton(password)) in COMMON
+
+def _pool(password: str) -> int:
+    # Size of the character classes the password draws from
+    chars = set(password)
+    pool = sum(size for members, size in CLASS_POOLS if not members.isdisjoint(chars))
+    if not password.isascii():
+        pool += 100
+    return pool or 1
+
+def estimate_bits(password: str) -> float:
+    # Character-class entropy, except that characters repeating or continuing
+    # a run (aaa, abc, 321) add a single bit, and common passwords are capped
+    if not password:
+        return 0.0
+    per_char = math.log2(_pool(password))
+    bits = per_char
+    step = None
+    previous = ord(password[0])
+    for current in map(ord, password[1:]):
+        delta = current - previous
+        previous = current
+        if -1 <= delta <= 1 and (step is None or delta == step):
+            bits += 1
+            step = delta
+        else:
+            bits += per_char
+            step = None
+    if is_common(password):
+        bits = min(bits, 10.0)
+    return bits
+
+def score(bits: float) -> int:
+    return sum(1 for threshold in SCORE_BITS[1:] if bits >= threshold)
+
+def _estimate_all(passwords: list) -> list:
+    return [estimate_bits(password) for password in passwords]
+
+def _estimate(passwords: list, workers: int | None) -> list:
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(passwords) < PARALLEL_THRESHOLD:
+        return _estimate_all(passwords)
+
+    # spawn rather than fork: the TUI calls this from a worker thread
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    size = math.ceil(len(passwords) / workers)
+    chunks = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return [bits for chunk in executor.map(_estimate_all, chunks) for bits in chunk]
+
+def audit_credentials(rows, min_length=MIN_LENGTH, workers: int | None = None) -> AuditReport:
+    # rows: (service, usrname, passwd) tuples
+    start = time.perf_counter()
+    key = os.urandom(32)
+    digests = []
+    by_digest = {}  # digest -> [row index]
+    by_skeleton = {}  # skeleton digest -> {digest: None}, in first-seen order
+    distinct = {}  # digest -> index into passwords
+    passwords = []
+    common = []
+
+    rows = list(rows)
+    for i, (_, _, passwd) in enumerate(rows):
+        digest = hashlib.blake2b(passwd.encode("utf-8"), key=key, digest_size=16).digest()
+        digests.append(digest)
+        by_digest.setdefault(digest, []).append(i)
+        if digest in distinct:
+            continue
+        distinct[digest] = len(passwords)
+        passwords.append(passwd)
+        shape = skeleton(passwd)
+        common.append(is_common(passwd, shape))
+        if len(shape) >= MIN_SKELETON:
+            shape_digest = hashlib.blake2b(shape.encode("utf-8"), key=key, digest_size=16, person=b"skeleton").digest()
+            by_skeleton.setdefault(shape_digest, {})[digest] = None
+
+    bits = _estimate(passwords, workers)
+
+    reused = {digest for digest, members in by_digest.items() if len(members) > 1}
+    similar = set()
+    similar_groups = []
+    for members in by_skeleton.values():
+        if len(members) > 1:
+            similar.update(members)
+            similar_groups.append([rows[i][:2] for digest in members for i in by_digest[digest]])
+
+    entries = []
+    for (service, usrname, passwd), digest in zip(rows, digests):
+        index = distinct[digest]
+        entry_bits = bits[index]
+        issues = []
+        if digest in reused:
+            issues.append("reused")
+        if digest in similar:
+            issues.append("similar")
+        if common[index]:
+            issues.append("common")
+        if entry_bits < SCORE_BITS[2]:
+            issues.append("weak")
+        if len(passwd) < min_length:
+            issues.append("short")
+        entries.append(EntryAudit(service, usrname, len(passwd), round(entry_bits, 1), score(entry_bits), tuple(issues)))
+
+    reused_groups = [[rows[i][:2] for i in by_digest[digest]] for digest in by_digest if digest in reused]
+    return AuditReport(entries, reused_groups, similar_groups, time.perf_counter() - start)
+
+def audit_vault(fernet, min_length=MIN_LENGTH, workers: int | None = None) -> AuditReport:
+    return audit_credentials(get_all_credentials(fernet), min_length, workers)
@@ -0,0 +1,82 @@
+###################
+## BATCH METHODS ##
+###################
+
+# Runs newline-delimited JSON requests against one unlocked vault:
+#
+#   {"op": "get", "service": "github"}            {"op": "get", "services": ["a", "b"]}
+#   {"op": "list"}                                {"op": "search", "query": "git", "limit": 5}
+#   {"op": "add", "service": "github", "username": "me", "password": "..."}
+#   {"op": "remove", "service": "github", "username": "me"}
+#
+# Each request gets one JSON line back, carrying the request's "id" if it had one.
+# Writes are collected in a single transaction and committed once the input
+# ends, so reads in a batch see the vault as it was before the batch.
+
+import json
+
+from core.data import get_many_credentials, get_services, search_services, transaction
+
+def credential_result(service: str, found: dict) -> dict:
+    if service not in found:
+        return {"service": service, "found": False}
+    usrname, passwd = found[service]
+    return {"service": service, "found": True, "username": usrname, "password": passwd}
+
+def _required(request: dict, field: str) -> str:
+    value = request.get(field)
+    if not isinstance(value, str) or not value:
+        raise ValueError(f"'{field}' is required")
+    return value
+
+def _handle(fernet, tx, request: dict):
+    op = request.get("op")
+    if op == "get":
+        services = request.get("services")
+        if services is None:
+            services = [_required(request, "service")]
+        if not isinstance(services, list) or not all(isinstance(s, str) for s in services):
+            raise ValueError("'services' must be a list of service names")
+        found = get_many_credentials(fernet, services)
+        results = [credential_result(service, found) for service in services]
+        return results if "services" in request else results[0]
+    if op == "list":
+        return get_services(fernet)
+    if op == "search":
+        matches = search_services(fernet, _required(request, "query"),
+                                  limit=int(request.get("limit", 5)),
+                                  score_cutoff=float(request.get("score_cutoff", 60)))
+        return [{"service": service, "score": score} for service, score in matches]
+    if op == "add":
+        tx.put(_required(request, "service"), request.get("username", ""), _required(request, "password"))
+        return None
+    if op == "remove":
+        tx.remove(_required(request, "service"), request.get("username"))
+        return None
+    raise ValueError(f"Unknown op '{op}'")
+
+def run_batch(fernet, lines, write) -> bool:
+    # write() gets each response line. Returns False if any request or the commit failed.
+    ok = True
+    try:
+        with transaction(fernet) as tx:
+            for line in lines:
+                if not line.strip():
+                    continue
+                request = {}
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("Each request must be a JSON object")
+                    response = {"ok": True, "result": _handle(fernet, tx, request)}
+                except (ValueError, TypeError) as e:
+                    ok = False
+                    response = {"ok": False, "error": str(e)}
+                # A line that parsed to a list, string or number has no id to echo
+                if isinstance(request, dict) and "id" in request:
+                    response = {"id": request["id"], **response}
+                write(json.dumps(response) + "\n")
+    except Exception as e:
+        write(json.dumps({"ok": False, "error": f"Batch aborted, nothing was written: {e}"}) + "\n")
+        return False
+    return ok
@@ -3,14 +3,77 @@
 ########################
 
 import os
+import tempfile
+import threading
+from contextlib import contextmanager
 from core.config import get_data_folder
+from core.trace import traced
 
+DATA_FILE = "data"
+LOCK_FILE = "data.lock"
+
+# Held by this process while it writes the vault; reentrant, so a commit that
+# triggers a migration doesn't wait on itself. (depth, lock file descriptor)
+_data_lock = threading.RLock()
+_data_lock_state = (0, None)
+
+@traced("io")
 def write_binary_data(data, filename: str):
+    folder = get_data_folder()
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, filename)
+
+    # Write a temporary file and rename it over the target, so a crash
+    # leaves either the old or the new file, never a torn one
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{filename}.", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    fsync_folder(folder)
+
+def append_binary_data(data, filename: str):
     path = os.path.join(get_data_folder(), filename)
-    os.makedirs(get_data_folder(), exist_ok=True)
-    with open(path, 'wb+') as file:
+    with open(path, 'ab') as file:
         file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
 
+def delete_binary_data(filename: str):
+    try:
+        os.remove(os.path.join(get_data_folder(), filename))
+    except FileNotFoundError:
+        pass
+
+def fsync_folder(folder):
+    # Makes a rename durable; directories can't be opened like this on Windows
+    if os.name != "posix":
+        return
+    fd = os.open(folder, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+@traced("io")
+def read_binary_head(filename: str, size: int) -> bytes | None:
+    # Only the first `size` bytes, e.g. the vault header
+    try:
+        path = os.path.join(get_data_folder(), filename)
+        with open(path, 'rb') as file:
+            return file.read(size)
+    except FileNotFoundError:
+        return None
+
+@traced("io")
 def read_binary_data(filename: str):
     try:
         path = os.path.join(get_data_folder(), filename)
@@ -20,3 +83,62 @@ def read_binary_data(filename: str):
     except FileNotFoundError:
         print ('No such file %s exists' % filename)
         return None
+
+def data_exists():
+    path = get_data_folder() / DATA_FILE
+    return path.exists()
+
+def _lock_file(fd):
+    if os.name == "nt":
+        import msvcrt
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue  # LK_LOCK gives up after 10 seconds
+    else:
+        import fcntl
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+def _unlock_file(fd):
+    if os.name == "nt":
+        import msvcrt
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+@contextmanager
+def data_lock():
+    # Advisory lock shared by every process using the data folder: the CLI,
+    # the TUI and the agent take it around each write to the vault files
+    global _data_lock_state
+    with _data_lock:
+        depth, fd = _data_lock_state
+        if depth == 0:
+            folder = get_data_folder()
+            path = os.path.join(folder, LOCK_FILE)
+            try:
+                fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            except FileNotFoundError:
+                os.makedirs(folder, exist_ok=True)
+                fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                _lock_file(fd)
+            except BaseException:
+                os.close(fd)
+                raise
+        _data_lock_state = (depth + 1, fd)
+        try:
+            yield
+        finally:
+            depth, fd = _data_lock_state
+            _data_lock_state = (depth - 1, fd if depth > 1 else None)
+            if depth == 1:
+                try:
+                    _unlock_file(fd)
+                finally:
+                    os.close(fd)
+
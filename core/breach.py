@@ -0,0 +1,116 @@
+####################
+## BREACH METHODS ##
+####################
+
+# Offline lookups against a breached-password corpus in the format of the
+# Have I Been Pwned downloader: one "SHA1HASH:COUNT" line per password,
+# upper-case hex, sorted by hash. The corpus is memory-mapped and binary
+# searched, so only the few pages each lookup touches are ever read, and
+# a multi-gigabyte file costs no more memory than a small one.
+#
+# Batches of hashes are looked up in sorted order, each search starting where
+# the previous one ended, so checking a whole vault walks the file forwards.
+
+import hashlib
+import mmap
+import re
+from pathlib import Path
+
+from core.config import load_config
+
+HASH_SIZE = 40
+LINE_FORMAT = re.compile(rb"[0-9A-F]{40}(:\d+)?\r?\n?")
+
+class BreachCorpusError(ValueError):
+    pass
+
+def password_hash(password: str) -> bytes:
+    return hashlib.sha1(password.encode("utf-8")).hexdigest().upper().encode("ascii")
+
+def get_corpus_path() -> Path | None:
+    path = load_config().get("breach_corpus")
+    return Path(path) if path else None
+
+def check_password(password: str) -> int | None:
+    # Breach count against the configured corpus, or None if there isn't one
+    path = get_corpus_path()
+    if path is None:
+        return None
+    with BreachCorpus(path) as corpus:
+        return corpus.count(password)
+
+class BreachCorpus:
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            if file.seek(0, 2) == 0:
+                raise BreachCorpusError(f"{self.path} is empty")
+            self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._check()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._mm.close()
+
+    def _check(self):
+        # Only the first and last lines; a full scan would defeat the point
+        mm = self._mm
+        first = mm[:mm.find(b"\n") + 1 or len(mm)]
+        end = len(mm)
+        while end and mm[end - 1] in b"\r\n":
+            end -= 1
+        last = mm[mm.rfind(b"\n", 0, end) + 1:end]
+        for line in (first, last):
+            if not LINE_FORMAT.fullmatch(line):
+                raise BreachCorpusError(f"{self.path} isn't a sorted SHA-1 corpus (expected HASH:COUNT lines)")
+        if first[:HASH_SIZE] > last[:HASH_SIZE]:
+            raise BreachCorpusError(f"{self.path} isn't sorted by hash")
+
+    def _search(self, target: bytes, lo: int, hi: int) -> tuple[int, int]:
+        # (count, offset of the first line >= target); count is 0 if absent
+        mm = self._mm
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = mm.rfind(b"\n", lo, mid) + 1 or lo
+            key = mm[start:start + HASH_SIZE]
+            if key < target:
+                end = mm.find(b"\n", start)
+                lo = hi if end < 0 else end + 1
+            elif key > target:
+                hi = start
+            else:
+                end = mm.find(b"\n", start)
+                field = mm[start + HASH_SIZE:len(mm) if end < 0 else end].strip().lstrip(b":")
+                return int(field or 1), start
+        return 0, lo
+
+    def count(self, password: str) -> int:
+        # Times the password was seen in breaches, 0 if never
+        return self._search(password_hash(password), 0, len(self._mm))[0]
+
+    def count_hashes(self, hashes) -> dict:
+        # {hash: count} for the hashes found
+        found = {}
+        lo = 0
+        for target in sorted(set(hashes)):
+            count, lo = self._search(target, lo, len(self._mm))
+            if count:
+                found[target] = count
+        return found
+
+def check_credentials(corpus: BreachCorpus, rows) -> list:
+    # (service, usrname, count) for each row whose password is in the corpus
+    rows = [(service, usrname, password_hash(passwd)) for service, usrname, passwd in rows]
+    found = corpus.count_hashes(digest for _, _, digest in rows)
+    return [(service, usrname, found[digest]) for service, usrname, digest in rows if digest in found]
+
+def breach_check_vault(fernet, path=None) -> list:
+    from core.data import iter_credentials
+
+    with BreachCorpus(path or get_corpus_path()) as corpus:
+        return check_credentials(corpus, iter_credentials(fernet))
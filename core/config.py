@@ -3,7 +3,9 @@
 ####################
 
 import json
+import os
 import sys
+import tempfile
 from pathlib import Path
 from platformdirs import user_config_dir
 
@@ -27,28 +29,74 @@ DEFAULT_DATA_FOLDER = ".dat/"
 
 DEFAULT_CONFIG = {
     "storage_dir": DEFAULT_DATA_FOLDER,  # Default storage location inside config dir
+    "session_backend": "keyring",  # keyring, file or memory
+    "sliding_session": False,  # Extend the session on each use
+    "breach_corpus": None,  # Sorted SHA-1 breach corpus checked on add, or None
 }
 
+# config.json is parsed, and the data folder resolved, once per change of the file:
+# (config signature, config) and (config signature, data folder)
+_config_cache = None
+_data_folder_cache = None
+
+def _config_signature():
+    try:
+        st = CONFIG_PATH.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
 def load_config() -> dict:
-    if not CONFIG_PATH.exists():
-        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    global _config_cache
+    signature = _config_signature()
+    if signature is None:
         save_config(DEFAULT_CONFIG)
-        return DEFAULT_CONFIG
-    with CONFIG_PATH.open("r", encoding="utf-8") as f:
-        return json.load(f)
+        return dict(DEFAULT_CONFIG)
+    if _config_cache is None or _config_cache[0] != signature:
+        with CONFIG_PATH.open("r", encoding="utf-8") as f:
+            _config_cache = (signature, json.load(f))
+    # Callers edit the result before saving it
+    return dict(_config_cache[1])
 
 def save_config(config: dict):
+    global _config_cache
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
     with CONFIG_PATH.open("w", encoding="utf-8") as f:
         json.dump(config, f, indent=4)
+    _config_cache = (_config_signature(), dict(config))
 
 def get_data_folder() -> Path:
+    global _data_folder_cache
+    signature = _config_signature()
+    if _data_folder_cache is not None and signature is not None and _data_folder_cache[0] == signature:
+        return _data_folder_cache[1]
+
     config = load_config()
     folder = config.get("storage_dir", DEFAULT_DATA_FOLDER)
     full_path = (CONFIG_DIR / folder).resolve()
     full_path.mkdir(parents=True, exist_ok=True)
+    _data_folder_cache = (_config_signature(), full_path)
     return full_path
 
+def get_runtime_folder() -> Path:
+    # Private per-user folder on tmpfs where there is one, for sockets and session files
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        folder = Path(runtime_dir) / APP_NAME
+    elif os.path.isdir("/dev/shm"):
+        folder = Path("/dev/shm") / f"{APP_NAME}-{os.getuid()}"
+    else:
+        folder = Path(tempfile.gettempdir()) / f"{APP_NAME}-{os.getuid()}"
+
+    # The folder may sit in a shared directory, so refuse one we don't own outright
+    folder.mkdir(mode=0o700, parents=True, exist_ok=True)
+    st = folder.lstat()
+    if folder.is_symlink() or not folder.is_dir() or st.st_uid != os.getuid():
+        raise PermissionError(f"Refusing to use runtime folder {folder}")
+    if st.st_mode & 0o077:
+        os.chmod(folder, 0o700)
+    return folder
+
 def get_styles_paths() -> list[Path]:
     paths = [BUILTIN_STYLES_PATH]
     if CUSTOM_STYLES_PATH.exists():
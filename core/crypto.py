@@ -1,41 +1,84 @@
 import os
-import base64
 
 from getpass import getpass
 from pathlib import Path
 from cryptography.fernet import Fernet, InvalidToken
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
-from core.binary import read_binary_data, write_binary_data
+from core.binary import DATA_FILE, data_exists, read_binary_data, read_binary_head, write_binary_data
 from core.config import get_data_folder
-from core.session import is_session_valid, save_session_key, load_session_key
+from core.session import save_session_key, load_session_key
+from core.trace import traced
+from core.kdf import LEGACY_KDF, derive_key
+from core.vaultfile import HEADER, VaultReader, WrongKeyError, unpack_header
 
 SALT_SIZE = 16
-DATA_FILE = "data"
 
-def get_salt():
+# (data file signature, header, salt), so the salt is re-read only when the file changes
+_header_cache = None
+
+def _read_header():
+    global _header_cache
     path = get_data_folder() / DATA_FILE
-    if path.exists():
-        return read_binary_data(DATA_FILE)[:SALT_SIZE]
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    if _header_cache is None or _header_cache[0] != signature:
+        # Version 2 keeps the salt in its header, version 1 starts with it
+        head = read_binary_head(DATA_FILE, HEADER.size) or b""
+        header = unpack_header(head)
+        salt = header.salt if header is not None else head[:SALT_SIZE]
+        _header_cache = (signature, header, salt)
+    return _header_cache
+
+def get_header():
+    # Header of a version 2 vault, or None
+    cached = _read_header()
+    return cached[1] if cached else None
+
+def get_salt():
+    cached = _read_header()
+    if cached is not None:
+        return cached[2]
     else:
-        salt = os.urandom(SALT_SIZE)
+        salt = new_salt()
         write_binary_data(salt, DATA_FILE)
         return salt
 
+def get_kdf() -> tuple:
+    # (kdf id, params) the vault was locked with
+    header = get_header()
+    if header is not None:
+        return header.kdf, header.kdf_params
+    return LEGACY_KDF
+
+@traced("kdf")
 def get_key(password):
-    salt = get_salt()
+    # The expensive step of an unlock: derive it once and pass the result on
+    kdf, params = get_kdf()
+    return derive_key(password, get_salt(), kdf, params)
+
+def new_salt() -> bytes:
+    return os.urandom(SALT_SIZE)
 
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=1_200_000,
-    )
+def derive_new_fernet(password, kdf: int, params: tuple) -> tuple[Fernet, bytes, bytes]:
+    # (fernet, key, salt) for re-keying the vault with a fresh salt and new KDF settings
+    salt = new_salt()
+    key = derive_key(password, salt, kdf, params)
+    return Fernet(key), key, salt
 
-    key = base64.urlsafe_b64encode(kdf.derive(password))
+def derive_fernet(password) -> tuple[Fernet, bytes]:
+    key = get_key(password)
+    return Fernet(key), key
 
-    return key
+def unlock(password) -> tuple[Fernet, bytes] | None:
+    # (fernet, key) if the password opens the vault, else None
+    fernet, key = derive_fernet(password)
+    if is_valid(fernet):
+        return fernet, key
+    return None
 
 def get_fernet(password=None):
     key = load_session_key()
@@ -49,7 +92,23 @@ def get_fernet(password=None):
     key = get_key(password)
     return Fernet(key)
 
+@traced("decrypt")
 def is_valid(fernet):
+    # A damaged file raises VaultFormatError rather than passing for a wrong password
+    path = get_data_folder() / DATA_FILE
+    try:
+        reader = VaultReader.open(path)
+    except FileNotFoundError:
+        return False
+
+    if reader is not None:
+        with reader:
+            try:
+                reader.read_directory(fernet)  # Test if key is valid
+                return True
+            except InvalidToken:
+                return False
+
     encrypted = read_binary_data(DATA_FILE)
 
     if not encrypted or len(encrypted) <= SALT_SIZE:
@@ -61,14 +120,15 @@ def is_valid(fernet):
     except InvalidToken:
         return False
 
+@traced("decrypt")
 def get_data_file(fernet: Fernet) -> bytes | None:
+    # Whole-file CSV of a version 1 vault
     try:
         dat = read_binary_data(DATA_FILE)
         read_dat = fernet.decrypt(dat[SALT_SIZE:]).decode('utf-8')
         return read_dat
     except InvalidToken:
-        print("Invalid password")
-        return None
+        raise WrongKeyError() from None
     except FileNotFoundError:
         print(f"No such file {DATA_FILE} exists")
         return None
@@ -78,28 +138,27 @@ def write_data_file(fernet: Fernet, data: str):
     write_binary_data(get_salt() + token, DATA_FILE)
 
 def prompt_for_password(prompt="Master password: "):
-    encrypted = read_binary_data(DATA_FILE)[SALT_SIZE:]
-
-    if is_session_valid():
+    key = load_session_key()  # One backend query, then checked locally
+    if key:
         try:
-            return get_fernet()
-        except Exception:
+            return Fernet(key)
+        except ValueError:
             pass
 
     while True:
         try:
             password = getpass(prompt).encode("utf-8")
-            
-            fernet = get_fernet(password)
-            if is_valid(fernet):
-                save_session_key(get_key(password))
+        except EOFError:
+            # No terminal and nothing left on stdin, e.g. a cron job whose session expired
+            raise SystemExit("❌ No password given.")
+        try:
+            unlocked = unlock(password)
+            if unlocked:
+                fernet, key = unlocked
+                save_session_key(key)
                 return fernet
             else:
                 print("❌ Invalid password. Please try again.")
         except Exception as e:
             print(f"\n❌ Unexpected error during password entry: {e}")
 
-
-def data_exists():
-    path = get_data_folder() / DATA_FILE
-    return path.exists()
@@ -2,61 +2,79 @@
 ## DATAFRAME METHODS ##
 #######################
 
-import io
-import pandas as pd
+from core.records import FIELD_NAMES, RecordStore
+from core.vault import close_vault, get_vault
+from core.trace import traced
 
-from core.crypto import get_data_file, write_data_file
-
-FIELD_NAMES = ["service", "usrname", "passwd"]
+# Records live in core.records; the DataFrame helpers below remain as a
+# compatibility shim for the TUI tables and only import pandas when called.
 
+@traced("parse")
 def get_dataframe(f):
-    read_dat = get_data_file(f)
-
-    if read_dat is None:
-        return create_empty_dataframe()
+    import pandas as pd
 
-    input = io.StringIO(read_dat)
-    df_read = pd.read_csv(input)
-    return df_read  
+    return pd.DataFrame([tuple(record) for record in get_vault(f).records()],
+                        columns=FIELD_NAMES, dtype=str)
 
+@traced("parse")
 def write_dataframe(f, df):
-    # Save to CSV in-memory using pandas
-    output = io.StringIO()
-    df.to_csv(output, index=False)
-    csv_data = output.getvalue()
-
-    # Encrypt and save to file
-    write_data_file(f, csv_data)
+    # Encrypt and save to file, keeping the session's cached records in sync
+    rows = df[FIELD_NAMES].astype(str).itertuples(index=False, name=None)
+    get_vault(f).save(RecordStore(rows))
 
 def create_empty_dataframe():
+    import pandas as pd
+
     # Create an empty DataFrame with the required columns
     return pd.DataFrame(columns=FIELD_NAMES)
 
 def add_service(fernet, service: str, usrname: str, passwd: str):
-    df = get_dataframe(fernet)
+    get_vault(fernet).put(service, usrname, passwd)
 
-    row = [service, usrname, passwd]
-    df = pd.concat([df, pd.DataFrame([row],
-                                     columns=FIELD_NAMES)],
-                   ignore_index=True)
-    
-    write_dataframe(fernet, df)
+def remove_service(fernet, service: str, usrname: str | None = None):
+    get_vault(fernet).remove(service, usrname)
 
-def remove_service(fernet, service: str):
-    df = get_dataframe(fernet)
-
-    df = df[df["service"] != service]
-
-    write_dataframe(fernet, df)
+def transaction(fernet):
+    # with transaction(fernet) as tx: tx.put(...); tx.remove(...); tx.update(...)
+    return get_vault(fernet).transaction()
 
 def get_credentials(fernet, service: str):
-    df = get_dataframe(fernet)
-    row = df.loc[df["service"] == service]
-    if not row.empty:
-        return row.iloc[0]["usrname"], row.iloc[0]["passwd"]
+    record = get_vault(fernet).get(service)
+    if record is not None:
+        return record.usrname, record.passwd
     return None, None
 
+def get_all_credentials(fernet) -> list:
+    # [(service, usrname, passwd)] in store order
+    return [tuple(record) for record in get_vault(fernet).records()]
+
+def get_many_credentials(fernet, services) -> dict:
+    # {service: (usrname, passwd)} for every requested service that exists
+    return {service: (record.usrname, record.passwd)
+            for service, record in get_vault(fernet).lookup(services).items()}
+
+def iter_credentials(fernet):
+    # (service, usrname, passwd) one at a time, for streaming the whole vault out
+    return get_vault(fernet).iter_records()
+
+def get_accounts(fernet) -> set:
+    # {(service, usrname)}; no passwords are decrypted
+    return get_vault(fernet).accounts()
+
 def get_services(fernet):
-    df = get_dataframe(fernet)
+    return get_vault(fernet).services()
+
+def search_services(fernet, query: str, limit=5, score_cutoff=60):
+    return get_vault(fernet).search(query, limit=limit, score_cutoff=score_cutoff)
+
+def rekey_vault(fernet, password: bytes, kdf: int, params: tuple):
+    # Returns the new (fernet, key); the caller's old fernet no longer opens the vault
+    from core.crypto import derive_new_fernet
+
+    new_fernet, key, salt = derive_new_fernet(password, kdf, params)
+    get_vault(fernet).rekey(new_fernet, kdf, params, salt)
+    close_vault()
+    return new_fernet, key
 
-    return df["service"].unique().tolist()
+def create_empty_vault(fernet):
+    get_vault(fernet).save(RecordStore())
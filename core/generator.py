@@ -0,0 +1,194 @@
+#######################
+## GENERATOR METHODS ##
+#######################
+
+# Passwords and passphrases drawn from os.urandom in bulk. Random bytes are
+# mapped onto the alphabet with rejection sampling: values past the largest
+# multiple of the alphabet size are dropped, so every symbol is equally likely.
+# A password missing a required class is thrown away whole and drawn again,
+# which keeps the result uniform over all passwords that meet the policy and
+# makes entropy_bits() exact rather than an estimate.
+
+import math
+import os
+import string
+from typing import NamedTuple
+
+CHARSETS = {
+    "upper": string.ascii_uppercase,
+    "lower": string.ascii_lowercase,
+    "digits": string.digits,
+    "symbols": string.punctuation,
+}
+CLASSES = tuple(CHARSETS)
+
+# Easily misread for one another in most fonts
+LOOK_ALIKES = "Il1|O0o`'"
+
+MAX_LENGTH = 1024
+MAX_WORDS = 64
+
+class PolicyError(ValueError):
+    pass
+
+class Policy(NamedTuple):
+    length: int = 16
+    classes: tuple = CLASSES
+    required: tuple | None = None  # None requires every class in use
+    exclude_look_alikes: bool = False
+    exclude: str = ""
+    words: int = 0  # Passphrase of this many words instead of characters
+    wordlist: tuple | None = None  # None uses the built-in list
+    separator: str = "-"
+
+def charsets(policy: Policy) -> dict:
+    # {class: characters left in it after exclusions}
+    excluded = set(policy.exclude)
+    if policy.exclude_look_alikes:
+        excluded.update(LOOK_ALIKES)
+    return {name: "".join(c for c in CHARSETS[name] if c not in excluded) for name in policy.classes}
+
+def required_classes(policy: Policy) -> tuple:
+    return policy.classes if policy.required is None else policy.required
+
+def wordlist(policy: Policy) -> tuple:
+    if policy.wordlist is not None:
+        return policy.wordlist
+    from core.wordlist import WORDS
+    return WORDS
+
+def read_wordlist(path: str) -> tuple:
+    # One word per line; diceware lists ("11111<tab>abacus") keep their last field
+    words = {}
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            fields = line.split()
+            if fields:
+                words[fields[-1]] = None
+    return tuple(words)
+
+def validate(policy: Policy):
+    if policy.words:
+        if not 1 <= policy.words <= MAX_WORDS:
+            raise PolicyError(f"Word count must be between 1 and {MAX_WORDS}")
+        if len(wordlist(policy)) < 2:
+            raise PolicyError("The wordlist needs at least two distinct words")
+        return
+
+    if not 1 <= policy.length <= MAX_LENGTH:
+        raise PolicyError(f"Length must be between 1 and {MAX_LENGTH}")
+    if len(set(policy.classes)) != len(policy.classes):
+        raise PolicyError("Each character class can only be used once")
+    unknown = [name for name in (*policy.classes, *(policy.required or ())) if name not in CHARSETS]
+    if unknown:
+        raise PolicyError(f"Unknown character class '{unknown[0]}'")
+    sets = charsets(policy)
+    if not "".join(sets.values()):
+        raise PolicyError("No characters left to choose from")
+    required = required_classes(policy)
+    for name in required:
+        if name not in sets:
+            raise PolicyError(f"Required class '{name}' isn't one of the classes in use")
+        if not sets[name]:
+            raise PolicyError(f"Every '{name}' character is excluded")
+    if len(required) > policy.length:
+        raise PolicyError(f"{len(required)} required classes don't fit in {policy.length} characters")
+
+def entropy_bits(policy: Policy) -> float:
+    # log2 of the number of outcomes the policy allows, each equally likely
+    validate(policy)
+    if policy.words:
+        return policy.words * math.log2(len(wordlist(policy)))
+
+    # Passwords containing every required class, by inclusion-exclusion over
+    # the classes left out (the classes don't overlap)
+    sets = charsets(policy)
+    size = sum(len(chars) for chars in sets.values())
+    sizes = [len(sets[name]) for name in required_classes(policy)]
+    total = 0
+    for mask in range(1 << len(sizes)):
+        missing = sum(sizes[i] for i in range(len(sizes)) if mask >> i & 1)
+        sign = -1 if bin(mask).count("1") % 2 else 1
+        total += sign * (size - missing) ** policy.length
+    return math.log2(total)
+
+def fit_entropy(policy: Policy, bits: float) -> Policy:
+    # The shortest policy like this one with at least `bits` of entropy
+    if policy.words:
+        words = math.ceil(bits / math.log2(len(wordlist(policy)))) if bits > 0 else 1
+        return policy._replace(words=max(words, 1))
+
+    length = max(len(required_classes(policy)), 1)
+    while entropy_bits(policy._replace(length=length)) < bits:
+        length += 1
+        if length > MAX_LENGTH:
+            raise PolicyError(f"{bits:g} bits needs more than {MAX_LENGTH} characters")
+    return policy._replace(length=length)
+
+def describe(policy: Policy) -> str:
+    bits = entropy_bits(policy)
+    if policy.words:
+        return f"{policy.words} words from a list of {len(wordlist(policy)):,}: {bits:.1f} bits each"
+    sets = charsets(policy)
+    size = sum(len(chars) for chars in sets.values())
+    required = required_classes(policy)
+    rules = f", requiring {', '.join(required)}" if required else ""
+    return f"{policy.length} characters from {size} symbols{rules}: {bits:.1f} bits each"
+
+def _draws(n: int):
+    # (bytes per draw, exclusive limit below which a draw is kept)
+    width = max(1, (n - 1).bit_length() + 7 >> 3)
+    span = 1 << 8 * width
+    return width, span - span % n
+
+def _sample(alphabet: str, count: int) -> str:
+    # `count` characters, each uniform over the alphabet. The byte -> character
+    # mapping, rejections included, runs as a single bytes.translate call.
+    width, limit = _draws(len(alphabet))
+    if width != 1 or not alphabet.isascii():
+        return "".join(_sample_many(alphabet, count))
+
+    encoded = alphabet.encode("ascii")
+    table = bytes(encoded[b % len(encoded)] if b < limit else 0 for b in range(256))
+    rejected = bytes(range(limit, 256))
+    out = bytearray()
+    while len(out) < count:
+        # A little over what the accept rate needs, so one read is usually enough
+        need = count - len(out)
+        out += os.urandom(need * 256 // limit + 16).translate(table, rejected)
+    return out[:count].decode("ascii")
+
+def _sample_many(items, count: int) -> list:
+    # Like _sample, for wordlists and alphabets too big for one byte per draw
+    width, limit = _draws(len(items))
+    out = []
+    while len(out) < count:
+        need = count - len(out)
+        data = os.urandom((need * (1 << 8 * width) // limit + 16) * width)
+        for i in range(0, len(data), width):
+            value = int.from_bytes(data[i:i + width], "little")
+            if value < limit:
+                out.append(items[value % len(items)])
+    return out[:count]
+
+def generate(policy: Policy = Policy(), count=1) -> list[str]:
+    validate(policy)
+    if policy.words:
+        words = _sample_many(wordlist(policy), count * policy.words)
+        return [policy.separator.join(words[i:i + policy.words]) for i in range(0, len(words), policy.words)]
+
+    sets = charsets(policy)
+    alphabet = "".join(sets.values())
+    required = [frozenset(sets[name]) for name in required_classes(policy)]
+    passwords = []
+    while len(passwords) < count:
+        need = count - len(passwords)
+        chars = _sample(alphabet, need * policy.length)
+        for i in range(0, len(chars), policy.length):
+            password = chars[i:i + policy.length]
+            if all(not members.isdisjoint(password) for members in required):
+                passwords.append(password)
+    return passwords[:count]
+
+def generate_password(policy: Policy = Policy()) -> str:
+    return generate(policy, 1)[0]
@@ -0,0 +1,54 @@
+#####################
+## JOURNAL METHODS ##
+#####################
+
+# Mutations since the last snapshot are appended to `data.journal`, one
+# Fernet token per line. Each entry names the snapshot generation it applies
+# to, so entries left behind by an interrupted compaction are ignored once the
+# new snapshot is in place.
+
+import json
+from cryptography.fernet import InvalidToken
+
+from core.binary import DATA_FILE
+from core.vaultfile import VaultFormatError
+
+JOURNAL_FILE = DATA_FILE + ".journal"
+
+# Fold the journal into a new snapshot once it grows past either limit
+JOURNAL_MAX_ENTRIES = 128
+JOURNAL_MAX_BYTES = 256 * 1024
+
+def put_op(service: str, usrname: str, passwd: str) -> list:
+    return ["put", service, usrname, passwd]
+
+def remove_op(service: str, usrname: str | None = None) -> list:
+    return ["remove", service, usrname]
+
+def encode_entry(fernet, generation: int, ops: list) -> bytes:
+    return fernet.encrypt(json.dumps({"generation": generation, "ops": ops}).encode("utf-8")) + b"\n"
+
+def decode_entries(fernet, data: bytes, generation: int) -> tuple[list, int]:
+    # (ops of every entry for this snapshot in order, bytes of the journal
+    # they came from). Only the last line may be unreadable: a crash mid-append
+    # tears nothing else. Anything before it means entries would be lost.
+    ops = []
+    start = 0
+    while (end := data.find(b"\n", start)) >= 0:
+        try:
+            entry = json.loads(fernet.decrypt(data[start:end]))
+        except (InvalidToken, ValueError):
+            if end + 1 < len(data):
+                raise VaultFormatError(f"Journal entry at byte {start} doesn't decrypt; entries after it would be lost") from None
+            break
+        if entry.get("generation") == generation:
+            ops.extend(entry["ops"])
+        start = end + 1
+    return ops, start
+
+def apply_ops(store, ops):
+    for op in ops:
+        if op[0] == "put":
+            store.put(*op[1:])
+        elif op[0] == "remove":
+            store.remove(*op[1:])
@@ -0,0 +1,99 @@
+#################
+## KDF METHODS ##
+#################
+
+# Key derivation functions a vault can be locked with. The id and three
+# integer parameters are stored in the version 2 header, so the cost can be
+# changed per vault without breaking existing ones.
+
+import base64
+import time
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+from core.trace import traced
+
+KDF_PBKDF2_SHA256 = 1  # params: (iterations, 0, 0)
+KDF_SCRYPT = 2  # params: (log2 n, r, p)
+
+KDF_NAMES = {
+    KDF_PBKDF2_SHA256: "pbkdf2-sha256",
+    KDF_SCRYPT: "scrypt",
+}
+
+PBKDF2_ITERATIONS = 1_200_000
+
+# Floors and ceilings for calibration, whatever the machine's speed
+MIN_PBKDF2_ITERATIONS = 600_000
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_MIN_LOG_N = 14  # 16 MiB
+SCRYPT_MAX_LOG_N = 18  # 256 MiB
+
+# Version 1 vaults have no header and were always locked with this
+LEGACY_KDF = (KDF_PBKDF2_SHA256, (PBKDF2_ITERATIONS, 0, 0))
+DEFAULT_KDF = LEGACY_KDF
+
+@traced("kdf")
+def derive_key(password: bytes, salt: bytes, kdf: int, params: tuple) -> bytes:
+    # Fernet key (urlsafe base64 of 32 bytes)
+    if kdf == KDF_PBKDF2_SHA256:
+        iterations, _, _ = params
+        derivation = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=salt,
+            iterations=iterations,
+        )
+    elif kdf == KDF_SCRYPT:
+        log_n, r, p = params
+        derivation = Scrypt(salt=salt, length=32, n=2 ** log_n, r=r, p=p)
+    else:
+        raise ValueError(f"Unknown KDF id {kdf}")
+
+    return base64.urlsafe_b64encode(derivation.derive(password))
+
+def memory_cost(kdf: int, params: tuple) -> int:
+    # Approximate bytes of memory one derivation needs
+    if kdf == KDF_SCRYPT:
+        log_n, r, _ = params
+        return 128 * r * 2 ** log_n
+    return 0
+
+def describe(kdf: int, params: tuple) -> str:
+    if kdf == KDF_PBKDF2_SHA256:
+        return f"{KDF_NAMES[kdf]} ({params[0]:,} iterations)"
+    if kdf == KDF_SCRYPT:
+        log_n, r, p = params
+        return f"{KDF_NAMES[kdf]} (n=2^{log_n}, r={r}, p={p})"
+    return f"unknown KDF {kdf}"
+
+def time_derivation(kdf: int, params: tuple, rounds=1) -> float:
+    # Best of `rounds`, in seconds
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        derive_key(b"benchmark", b"\0" * 16, kdf, params)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+    return best
+
+def calibrate(kdf: int, target: float) -> tuple:
+    # Parameters whose derivation takes about `target` seconds on this machine
+    if kdf == KDF_PBKDF2_SHA256:
+        probe = 100_000
+        seconds = time_derivation(kdf, (probe, 0, 0), rounds=3)
+        iterations = int(round(probe * target / seconds, -4))
+        return (max(MIN_PBKDF2_ITERATIONS, iterations), 0, 0)
+
+    if kdf == KDF_SCRYPT:
+        # Cost doubles with each step of n, so take the largest that still fits
+        best = (SCRYPT_MIN_LOG_N, SCRYPT_R, SCRYPT_P)
+        for log_n in range(SCRYPT_MIN_LOG_N, SCRYPT_MAX_LOG_N + 1):
+            params = (log_n, SCRYPT_R, SCRYPT_P)
+            if time_derivation(kdf, params) > target:
+                break
+            best = params
+        return best
+
+    raise ValueError(f"Unknown KDF id {kdf}")
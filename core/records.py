@@ -0,0 +1,115 @@
+####################
+## RECORD METHODS ##
+####################
+
+import csv
+import io
+
+from core.trace import traced
+
+FIELD_NAMES = ["service", "usrname", "passwd"]
+
+class Record:
+    # passwd is None until resolved from the vault file; ref is the (offset, length)
+    # of the record's token in the current file, or None once it has been edited
+    __slots__ = ("service", "usrname", "passwd", "ref")
+
+    def __init__(self, service: str, usrname: str, passwd: str | None, ref=None):
+        self.service = service
+        self.usrname = usrname
+        self.passwd = passwd
+        self.ref = ref
+
+    def __iter__(self):
+        return iter((self.service, self.usrname, self.passwd))
+
+    def __eq__(self, other):
+        return isinstance(other, Record) and tuple(self) == tuple(other)
+
+    def __repr__(self):
+        return f"Record(service={self.service!r}, usrname={self.usrname!r})"
+
+class RecordStore:
+    # Records indexed by service, then by username within a service.
+    # Both dicts keep insertion order, so the first account stored for a
+    # service is the one get() returns, as with the old DataFrame scan.
+    def __init__(self, records=()):
+        self._services = {}
+        self._count = 0
+        for record in records:
+            self.put(*record)
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for accounts in self._services.values():
+            yield from accounts.values()
+
+    def __contains__(self, service):
+        return service in self._services
+
+    def services(self) -> list[str]:
+        return list(self._services)
+
+    def get(self, service: str) -> Record | None:
+        accounts = self._services.get(service)
+        if not accounts:
+            return None
+        return next(iter(accounts.values()))
+
+    def find(self, service: str, usrname: str) -> Record | None:
+        return self._services.get(service, {}).get(usrname)
+
+    def put(self, service: str, usrname: str, passwd: str) -> Record:
+        # Upsert on (service, usrname)
+        record = self.find(service, usrname)
+        if record is None:
+            return self.insert(Record(service, usrname, passwd))
+        record.passwd = passwd
+        record.ref = None
+        return record
+
+    def insert(self, record: Record) -> Record:
+        accounts = self._services.setdefault(record.service, {})
+        if record.usrname not in accounts:
+            self._count += 1
+        accounts[record.usrname] = record
+        return record
+
+    def remove(self, service: str, usrname: str | None = None) -> list[Record]:
+        # Removes one account, or every account for the service when usrname is None
+        accounts = self._services.get(service)
+        if not accounts:
+            return []
+
+        if usrname is None:
+            removed = list(accounts.values())
+            accounts.clear()
+        else:
+            record = accounts.pop(usrname, None)
+            removed = [record] if record is not None else []
+
+        if not accounts:
+            del self._services[service]
+        self._count -= len(removed)
+        return removed
+
+    def copy(self) -> "RecordStore":
+        store = RecordStore()
+        for record in self:
+            store.insert(Record(record.service, record.usrname, record.passwd, record.ref))
+        return store
+
+    def to_csv(self) -> str:
+        output = io.StringIO()
+        writer = csv.writer(output, lineterminator="\n")
+        writer.writerow(FIELD_NAMES)
+        writer.writerows(tuple(record) for record in self)
+        return output.getvalue()
+
+@traced("parse")
+def parse_csv(text: str) -> RecordStore:
+    reader = csv.DictReader(io.StringIO(text))
+    return RecordStore((row.get("service") or "", row.get("usrname") or "", row.get("passwd") or "")
+                       for row in reader)
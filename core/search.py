@@ -0,0 +1,74 @@
+####################
+## SEARCH METHODS ##
+####################
+
+import unicodedata
+from rapidfuzz import fuzz, process
+
+def normalize(text) -> str:
+    return unicodedata.normalize("NFKC", str(text)).casefold().strip()
+
+class SearchIndex:
+    # Fuzzy index over service names and usernames, updated in place on add/remove.
+    # Every new query is scored against every entry: WRatio isn't monotone as
+    # a query grows (one more character can lift a score from any value), so
+    # pruning on a shorter prefix's scores would drop real matches. What is
+    # kept is the scores of the queries on the way to the current one, so
+    # backspacing or searching again costs nothing.
+    def __init__(self, rows=()):
+        self._services = {}
+        self._usernames = {}
+        self._history = []  # [(query, score_cutoff, {service: score})], each query a prefix of the next
+
+        for service, usrname in rows:
+            self.add(service, usrname)
+
+    def __len__(self):
+        return len(self._services)
+
+    def add(self, service, usrname):
+        self._services[service] = normalize(service)
+        self._usernames[service] = normalize(usrname)
+        for query, score_cutoff, scores in self._history:
+            scores.pop(service, None)
+            score = self._score_one(query, service, score_cutoff)
+            if score is not None:
+                scores[service] = score
+
+    def remove(self, service):
+        self._services.pop(service, None)
+        self._usernames.pop(service, None)
+        for _, _, scores in self._history:
+            scores.pop(service, None)
+
+    def search(self, query: str, limit=5, score_cutoff=60):
+        query = normalize(query)
+        if not query:
+            return []
+
+        while self._history and not query.startswith(self._history[-1][0]):
+            self._history.pop()
+
+        if self._history and self._history[-1][:2] == (query, score_cutoff):
+            scores = self._history[-1][2]
+        else:
+            scores = self._score(query, score_cutoff)
+            self._history.append((query, score_cutoff, scores))
+
+        # Ties go by name, so the order never depends on how the scores were gathered
+        results = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+        return results[:limit]
+
+    def _score(self, query, score_cutoff):
+        scores = {}
+        for choices in (self._services, self._usernames):
+            for _, score, service in process.extract_iter(query, choices, scorer=fuzz.WRatio,
+                                                          processor=None, score_cutoff=score_cutoff):
+                if score > scores.get(service, 0):
+                    scores[service] = score
+        return scores
+
+    def _score_one(self, query, service, score_cutoff):
+        score = max(fuzz.WRatio(query, self._services[service], processor=None),
+                    fuzz.WRatio(query, self._usernames[service], processor=None))
+        return score if score >= score_cutoff else None
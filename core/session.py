@@ -3,38 +3,143 @@
 #####################
 
 import base64
+import os
 import time
-import keyring
+
+from core.config import get_runtime_folder, load_config
+from core.trace import traced
 
 SESSION_SERVICE = "password_manager_session"
 SESSION_USER = "session_key"
 SESSION_DURATION = 300 # seconds
+SESSION_FILE = "session"
+
+# With sliding expiry the stored timestamp is refreshed on use, at most this often,
+# so a busy session doesn't write to the backend on every command
+SLIDE_INTERVAL = 30 # seconds
+
+# Sessions are stored as "timestamp|base64 key" by one of these backends,
+# picked with "session_backend" in config.json or PM_SESSION_BACKEND
+class KeyringBackend:
+    # OS credential store (Secret Service over D-Bus, Keychain, Credential Locker)
+    def read(self) -> str | None:
+        import keyring
+        return keyring.get_password(SESSION_SERVICE, SESSION_USER)
+
+    def write(self, data: str):
+        import keyring
+        keyring.set_password(SESSION_SERVICE, SESSION_USER, data)
+
+    def delete(self):
+        import keyring
+        try:
+            keyring.delete_password(SESSION_SERVICE, SESSION_USER)
+        except keyring.errors.PasswordDeleteError:
+            pass # No session stored
+
+class FileBackend:
+    # 0600 file in the per-user runtime folder, which is tmpfs on most Linux systems
+    def _path(self):
+        return get_runtime_folder() / SESSION_FILE
+
+    def read(self) -> str | None:
+        try:
+            return self._path().read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def write(self, data: str):
+        path = self._path()
+        tmp = path.with_name(path.name + ".tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def delete(self):
+        try:
+            self._path().unlink()
+        except FileNotFoundError:
+            pass
+
+class MemoryBackend:
+    # Lives and dies with this process, e.g. for one TUI run
+    def __init__(self):
+        self._data = None
+
+    def read(self) -> str | None:
+        return self._data
 
+    def write(self, data: str):
+        self._data = data
+
+    def delete(self):
+        self._data = None
+
+SESSION_BACKENDS = {
+    "keyring": KeyringBackend,
+    "file": FileBackend,
+    "memory": MemoryBackend,
+}
+DEFAULT_SESSION_BACKEND = "keyring"
+
+_backend = None
+_backend_name = None
+
+# (timestamp, key) of the session this process last read or saved, so expiry is
+# checked locally instead of asking the backend again
+_session_cache = None
+
+def get_session_backend():
+    global _backend, _backend_name
+    name = os.environ.get("PM_SESSION_BACKEND") or load_config().get("session_backend", DEFAULT_SESSION_BACKEND)
+    if name not in SESSION_BACKENDS:
+        raise ValueError(f"Unknown session backend '{name}'. Choose from: {', '.join(SESSION_BACKENDS)}")
+    if _backend is None or _backend_name != name:
+        _backend, _backend_name = SESSION_BACKENDS[name](), name
+    return _backend
+
+def is_sliding() -> bool:
+    return bool(load_config().get("sliding_session", False))
+
+def _store(timestamp: float, key: bytes):
+    global _session_cache
+    session_data = f"{timestamp}|{base64.urlsafe_b64encode(key).decode('utf-8')}"
+    get_session_backend().write(session_data)
+    _session_cache = (timestamp, key)
+
+@traced("session")
 def save_session_key(key: bytes):
-    session_data = f"{time.time()}|{base64.urlsafe_b64encode(key).decode('utf-8')}"
-    keyring.set_password(SESSION_SERVICE, SESSION_USER, session_data)
-        
+    _store(time.time(), key)
 
+@traced("session")
 def load_session_key() -> bytes | None:
-    session_data = keyring.get_password(SESSION_SERVICE, SESSION_USER)
-    if not session_data:
-        return None
-    try:
-        timestamp_str, key_str = session_data.split("|")
-        timestamp = float(timestamp_str)
-        if time.time() - timestamp > SESSION_DURATION:
-            lock_session()
+    global _session_cache
+    if _session_cache is None:
+        session_data = get_session_backend().read()
+        if not session_data:
             return None
-        return base64.urlsafe_b64decode(key_str.encode())
-    except Exception:
+        try:
+            timestamp_str, key_str = session_data.split("|")
+            _session_cache = (float(timestamp_str), base64.urlsafe_b64decode(key_str.encode()))
+        except Exception:
+            return None
+
+    timestamp, key = _session_cache
+    now = time.time()
+    if now - timestamp > SESSION_DURATION:
+        lock_session()
         return None
+    if now - timestamp > SLIDE_INTERVAL and is_sliding():
+        _store(now, key)
+    return key
 
 
+@traced("session")
 def lock_session():
-    try:
-        keyring.delete_password(SESSION_SERVICE, SESSION_USER)
-    except keyring.errors.PasswordDeleteError:
-        pass # No session stored
+    global _session_cache
+    _session_cache = None
+    get_session_backend().delete()
 
 def is_session_valid() -> bool:
     key = load_session_key()
@@ -0,0 +1,106 @@
+###################
+## TRACE METHODS ##
+###################
+
+# Timed spans around the crypto, storage and UI hot paths, written as a
+# Chrome trace (open it in chrome://tracing or https://ui.perfetto.dev).
+# Tracing is switched on with PM_TRACE=<file> or `--profile [file]`, and
+# must be on before the traced modules are imported: @traced decides once,
+# at import, and returns the function untouched when tracing is off.
+
+import atexit
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+DEFAULT_TRACE_FILE = "pm-trace.json"
+
+_trace_path = None
+_profile_path = None
+_profiler = None
+_events = []
+_origin = time.perf_counter_ns()
+
+def enable(path: str | None = None, profile_path: str | None = None):
+    global _trace_path, _profile_path, _profiler
+    if _trace_path is None:
+        atexit.register(write)
+    _trace_path = path or DEFAULT_TRACE_FILE
+    if profile_path and _profiler is None:
+        import cProfile
+
+        _profile_path = profile_path
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+def is_enabled() -> bool:
+    return _trace_path is not None
+
+def _record(name: str, category: str, start: int, end: int):
+    _events.append({
+        "name": name,
+        "cat": category,
+        "ph": "X",
+        "ts": (start - _origin) / 1000,
+        "dur": (end - start) / 1000,
+        "pid": os.getpid(),
+        "tid": threading.get_ident(),
+    })
+
+@contextmanager
+def _span(name: str, category: str):
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        _record(name, category, start, time.perf_counter_ns())
+
+def span(name: str, category: str = "app"):
+    # For blocks that aren't a whole function
+    if _trace_path is None:
+        return nullcontext()
+    return _span(name, category)
+
+def traced(category: str, name: str | None = None):
+    def decorator(fn):
+        if _trace_path is None:
+            return fn
+
+        label = name or fn.__qualname__
+        if inspect.iscoroutinefunction(fn):
+            # Spans the whole await, including time spent waiting on the pool
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter_ns()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    _record(label, category, start, time.perf_counter_ns())
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record(label, category, start, time.perf_counter_ns())
+        return wrapper
+    return decorator
+
+def write():
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler.dump_stats(_profile_path)
+    if _trace_path is None:
+        return
+    with open(_trace_path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": list(_events), "displayTimeUnit": "ms"}, f)
+
+if os.environ.get("PM_TRACE"):
+    enable(None if os.environ["PM_TRACE"] == "1" else os.environ["PM_TRACE"],
+           os.environ.get("PM_TRACE_CPROFILE"))
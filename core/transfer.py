@@ -0,0 +1,276 @@
+######################
+## TRANSFER METHODS ##
+######################
+
+# Bulk import of credential dumps. Rows are streamed from the file, checked
+# against the vault's accounts and committed in a single transaction, so an
+# import costs one vault write however many rows it holds.
+#
+# Exports stream the other way, one decrypted record at a time. Encrypted
+# exports use a salt and a key derived from their own passphrase, like the
+# version 1 data file, but seal the output in a sequence of Fernet tokens so
+# it never has to be held in memory whole:
+#
+#   header | Fernet(chunk 0) \n Fernet(chunk 1) \n ...
+#
+# Each chunk starts with its index and a last-chunk flag, so chunks that are
+# dropped, reordered or cut off are noticed when the export is read back.
+
+import csv
+import io
+import json
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import NamedTuple
+from urllib.parse import urlparse
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from core.data import get_accounts, iter_credentials, transaction
+from core.records import FIELD_NAMES
+
+FORMATS = ("csv", "json", "jsonl")
+EXPORT_FORMATS = ("csv", "jsonl")
+
+EXPORT_MAGIC = b"PMX1"
+# magic | format | kdf id | kdf params (3) | salt
+EXPORT_HEADER = struct.Struct(">4sBB3I16s")
+# chunk index | last chunk
+CHUNK_HEADER = struct.Struct(">Q?")
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+class ExportFormatError(ValueError):
+    pass
+
+# Column names used by common exporters (Chrome, Firefox, Bitwarden, LastPass,
+# 1Password, KeePassXC, Dashlane) for each field, most specific first
+COLUMN_ALIASES = dict(zip(FIELD_NAMES, (
+    ("service", "name", "title", "account", "url", "login_uri", "website", "web site"),
+    ("usrname", "username", "login_username", "login name", "user name", "login", "email", "user"),
+    ("passwd", "password", "login_password", "pass"),
+)))
+
+class ImportReport(NamedTuple):
+    read: int
+    imported: int
+    existing: int    # Already in the vault and left alone
+    duplicates: int  # Repeated within the file; the first one wins
+    invalid: int     # Missing a service or a password
+    seconds: float
+
+def detect_format(path: str, fmt: str | None = None) -> str:
+    if fmt:
+        return fmt
+    suffix = Path(path).suffix.lower().lstrip(".")
+    if suffix == "ndjson":
+        return "jsonl"
+    return suffix if suffix in FORMATS else "csv"
+
+def _is_encrypted(raw) -> bool:
+    # Looks ahead without consuming anything, so it works on stdin too
+    return raw.peek(len(EXPORT_MAGIC))[:len(EXPORT_MAGIC)] == EXPORT_MAGIC
+
+def is_encrypted_export(path: str) -> bool:
+    if path == "-":
+        return _is_encrypted(sys.stdin.buffer)
+    with open(path, "rb") as raw:
+        return _is_encrypted(raw)
+
+def _open(path: str, passphrase: bytes | None = None):
+    # Text stream over the file, decrypting it first if it is an encrypted export
+    raw = sys.stdin.buffer if path == "-" else open(path, "rb")
+    if _is_encrypted(raw):
+        if passphrase is None:
+            raw.close()
+            raise ExportFormatError("This is an encrypted export; a passphrase is needed to read it")
+        return _DecryptedExport(raw, passphrase)
+    # utf-8-sig drops the BOM some spreadsheet exports start with
+    return io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+
+def _flatten(item: dict) -> dict:
+    # Bitwarden's JSON export nests the credential under "login"
+    row = {str(k).strip().lower(): v for k, v in item.items()}
+    login = row.get("login")
+    if isinstance(login, dict):
+        # Once flattened, "login" must not be read as the username column
+        del row["login"]
+        for key, value in login.items():
+            row[f"login_{key.lower()}"] = value
+        uris = login.get("uris") or []
+        if uris and isinstance(uris[0], dict):
+            row["login_uri"] = uris[0].get("uri")
+    return row
+
+def _rows(file, fmt: str):
+    # Lower-cased {column: value} dicts, one per row, read lazily
+    if fmt == "csv":
+        for row in csv.DictReader(file):
+            yield {(k or "").strip().lower(): v for k, v in row.items()}
+    elif fmt == "jsonl":
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                item = None
+            yield _flatten(item) if isinstance(item, dict) else {}
+    else:
+        # A plain JSON document has to be parsed whole
+        data = json.load(file)
+        if isinstance(data, dict):
+            data = data.get("items", [])
+        for item in data:
+            yield _flatten(item) if isinstance(item, dict) else {}
+
+def _field(row: dict, field: str) -> str:
+    for column in COLUMN_ALIASES[field]:
+        value = row.get(column)
+        # Nested values, like a Bitwarden item's "fields", are never a field on their own
+        if value not in (None, "") and not isinstance(value, (dict, list)):
+            value = str(value).strip()
+            if field == "service" and "://" in value:
+                value = urlparse(value).hostname or value  # Exporters without a name column
+            return value
+    return ""
+
+def read_credentials(path: str, fmt: str | None = None, passphrase: bytes | None = None):
+    # (service, usrname, passwd) for each row; invalid rows come through with empty fields
+    file = _open(path, passphrase)
+    try:
+        if isinstance(file, _DecryptedExport):
+            fmt = file.format
+        for row in _rows(file, detect_format(path, fmt)):
+            yield tuple(_field(row, field) for field in FIELD_NAMES)
+    finally:
+        if path != "-":
+            file.close()
+
+def import_credentials(fernet, path: str, fmt: str | None = None, overwrite=False, dry_run=False,
+                       passphrase: bytes | None = None) -> ImportReport:
+    start = time.perf_counter()
+    accounts = get_accounts(fernet)
+    seen = set()
+    read = imported = existing = duplicates = invalid = 0
+
+    with transaction(fernet) as tx:
+        for service, usrname, passwd in read_credentials(path, fmt, passphrase):
+            read += 1
+            if not service or not passwd:
+                invalid += 1
+                continue
+            account = (service, usrname)
+            if account in seen:
+                duplicates += 1
+                continue
+            seen.add(account)
+            if account in accounts and not overwrite:
+                existing += 1
+                continue
+            imported += 1
+            if not dry_run:
+                tx.put(service, usrname, passwd)
+
+    return ImportReport(read, imported, existing, duplicates, invalid, time.perf_counter() - start)
+
+class _DecryptedExport:
+    # Lines of an encrypted export, decrypted a chunk at a time
+    def __init__(self, raw, passphrase: bytes):
+        from core.kdf import derive_key
+
+        header = raw.read(EXPORT_HEADER.size)
+        if len(header) != EXPORT_HEADER.size:
+            raise ExportFormatError("Encrypted export is truncated")
+        _, fmt, kdf, p1, p2, p3, salt = EXPORT_HEADER.unpack(header)
+        if fmt >= len(EXPORT_FORMATS):
+            raise ExportFormatError(f"Unsupported export format {fmt}")
+        self.format = EXPORT_FORMATS[fmt]
+        self.fernet = Fernet(derive_key(passphrase, salt, kdf, (p1, p2, p3)))
+        self._raw = raw
+
+    def __iter__(self):
+        index = 0
+        last = False
+        for line in self._raw:
+            if not line.strip():
+                continue
+            if last:
+                raise ExportFormatError("Encrypted export continues past its last chunk")
+            try:
+                chunk = self.fernet.decrypt(line.strip())
+            except InvalidToken:
+                raise ExportFormatError("Wrong passphrase, or the export is corrupted") from None
+            chunk_index, last = CHUNK_HEADER.unpack_from(chunk)
+            if chunk_index != index:
+                raise ExportFormatError("Encrypted export chunks are out of order")
+            index += 1
+            # Split like the plain-text path does; str.splitlines would also break on \x85, \u2028...
+            yield from io.StringIO(chunk[CHUNK_HEADER.size:].decode("utf-8"), newline="")
+        if not last:
+            raise ExportFormatError("Encrypted export is truncated")
+
+    def close(self):
+        self._raw.close()
+
+class _EncryptedExport:
+    # Seals each chunk written to it under a key derived from the export passphrase
+    def __init__(self, out, fmt: str, passphrase: bytes):
+        from core.crypto import get_kdf, new_salt
+        from core.kdf import derive_key
+
+        # The vault's own KDF settings, so the export is as costly to attack
+        kdf, params = get_kdf()
+        salt = new_salt()
+        self.fernet = Fernet(derive_key(passphrase, salt, kdf, params))
+        self.out = out
+        self.index = 0
+        out.write(EXPORT_HEADER.pack(EXPORT_MAGIC, EXPORT_FORMATS.index(fmt), kdf, *params, salt))
+
+    def write(self, data: bytes, last=False):
+        self.out.write(self.fernet.encrypt(CHUNK_HEADER.pack(self.index, last) + data) + b"\n")
+        self.index += 1
+
+def _export_rows(fernet, fmt: str):
+    # Encoded rows of the export, header first for CSV
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(FIELD_NAMES)
+        yield buffer.getvalue().encode("utf-8")
+        for row in iter_credentials(fernet):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(row)
+            yield buffer.getvalue().encode("utf-8")
+    else:
+        for row in iter_credentials(fernet):
+            yield json.dumps(dict(zip(FIELD_NAMES, row))).encode("utf-8") + b"\n"
+
+def export_credentials(fernet, out, fmt="csv", passphrase: bytes | None = None) -> tuple[int, float]:
+    # Streams the vault to a binary file object in chunks of whole rows.
+    # Returns (records written, seconds).
+    start = time.perf_counter()
+    sink = _EncryptedExport(out, fmt, passphrase) if passphrase is not None else None
+    write = sink.write if sink is not None else out.write
+
+    count = -1 if fmt == "csv" else 0  # The CSV header isn't a record
+    pending = []
+    size = 0
+    for row in _export_rows(fernet, fmt):
+        count += 1
+        pending.append(row)
+        size += len(row)
+        if size >= EXPORT_CHUNK_SIZE:
+            write(b"".join(pending))
+            pending.clear()
+            size = 0
+
+    chunk = b"".join(pending)
+    if sink is not None:
+        sink.write(chunk, last=True)
+    elif chunk:
+        out.write(chunk)
+    out.flush()
+    return max(count, 0), time.perf_counter() - start
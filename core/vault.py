@@ -0,0 +1,537 @@
+###################
+## VAULT METHODS ##
+###################
+
+import io
+import os
+import threading
+from contextlib import contextmanager
+from cryptography.fernet import InvalidToken
+
+from core.binary import (DATA_FILE, append_binary_data, data_lock, delete_binary_data, read_binary_head,
+                         write_binary_data)
+from core.config import get_data_folder
+from core.crypto import get_data_file, get_kdf, get_salt
+from core.journal import (JOURNAL_FILE, JOURNAL_MAX_BYTES, JOURNAL_MAX_ENTRIES, apply_ops,
+                          decode_entries, encode_entry, put_op, remove_op)
+from core.records import Record, RecordStore, parse_csv
+from core.trace import traced
+from core.vaultfile import (HEADER, Header, VaultFormatError, VaultReader, WrongKeyError, decrypt_record,
+                            encrypt_record, new_bucket_key, pack_vault, unpack_header)
+
+# Times an edit is replayed on a fresh read before giving up
+COMMIT_ATTEMPTS = 3
+
+# Services a lookup reads one bucket at a time when nothing is cached; past
+# this, loading the whole index is cheaper (about 350 on a 100k-entry vault)
+DIRECT_LOOKUP_MAX = 64
+
+class VaultChangedError(Exception):
+    # The data file was rewritten by someone else while we were reading it
+    pass
+
+class Transaction:
+    # Edits collected inside Vault.transaction(); nothing is written until the block exits.
+    # Reads go to the vault, so they see committed state, not pending edits.
+    def __init__(self, vault):
+        self.vault = vault
+        self.ops = []
+
+    def put(self, service: str, usrname: str, passwd: str):
+        self.ops.append(put_op(service, usrname, passwd))
+
+    def remove(self, service: str, usrname: str | None = None):
+        self.ops.append(remove_op(service, usrname))
+
+    def update(self, service: str, usrname: str, passwd: str | None = None, new_usrname: str | None = None):
+        if passwd is None:
+            record = self.vault.lookup_account(service, usrname)
+            if record is None:
+                raise KeyError(f"No account '{usrname}' for '{service}'")
+            passwd = record.passwd
+        self.remove(service, usrname)
+        self.put(service, new_usrname if new_usrname is not None else usrname, passwd)
+
+class Vault:
+    # Decrypted view of the data file, shared for the lifetime of one unlocked session.
+    # The files are only read again when their stat signature changes on disk,
+    # and passwords are only decrypted when something asks for them.
+    # Edits are appended to the journal and folded into a new snapshot by a
+    # background compaction once the journal grows large enough.
+    # Other processes may edit the same files: every write happens under
+    # data_lock(), against a freshly checked copy, and each snapshot gets a
+    # higher generation than the one it replaces.
+    def __init__(self, fernet):
+        self.fernet = fernet
+        self._store = None
+        self._header = None
+        self._bucket_key = None
+        self._signature = None
+        self._index = None
+        self._journal_entries = 0
+        self._journal_size = 0
+        self._journal_torn = False
+        self._compactor = None
+        # The TUI searches from worker threads while the UI thread edits
+        self._lock = threading.RLock()
+
+    def records(self) -> RecordStore:
+        # Every record, with its password decrypted
+        def read():
+            store = self._catalog()
+            self._resolve(store)
+            return store
+        return self._read(read)
+
+    def iter_records(self):
+        # (service, usrname, passwd) of every record, decrypted one at a time.
+        # Unlike records(), passwords are not kept in the cache, so a full
+        # export holds no more than one plaintext at once. Edits wait until
+        # the iteration finishes.
+        with self._lock:
+            store = self._catalog()
+            reader = None
+            if any(record.passwd is None for record in store):
+                reader = self._open_snapshot(self._header)
+            try:
+                for record in store:
+                    passwd = record.passwd
+                    if passwd is None:
+                        token = reader.read_token(*record.ref)
+                        passwd = decrypt_record(self.fernet, token, record.service, record.usrname)
+                    yield record.service, record.usrname, passwd
+            finally:
+                if reader is not None:
+                    reader.close()
+
+    def get(self, service: str) -> Record | None:
+        def read():
+            if self._store is None or self._stat_signature() != self._signature:
+                return self._get_direct([service]).get(service)
+            record = self._store.get(service)
+            if record is not None:
+                self._resolve([record])
+            return record
+        return self._read(read)
+
+    def services(self) -> list[str]:
+        with self._lock:
+            return self._catalog().services()
+
+    def accounts(self) -> set:
+        # {(service, usrname)} of every record, without decrypting any password
+        with self._lock:
+            return {(record.service, record.usrname) for record in self._catalog()}
+
+    def lookup(self, services) -> dict:
+        # {service: Record} for every requested service that exists
+        services = list(services)
+
+        def read():
+            if len(services) <= DIRECT_LOOKUP_MAX and (self._store is None or self._stat_signature() != self._signature):
+                # Nothing cached (a one-shot `get`): only the buckets of these services
+                return self._get_direct(services)
+            store = self._catalog()
+            found = {}
+            for service in services:
+                record = store.get(service)
+                if record is not None:
+                    found[service] = record
+            self._resolve(found.values())
+            return found
+        return self._read(read)
+
+    def lookup_account(self, service: str, usrname: str) -> Record | None:
+        def read():
+            record = self._catalog().find(service, usrname)
+            if record is not None:
+                self._resolve([record])
+            return record
+        return self._read(read)
+
+    def search_index(self):
+        # rapidfuzz is only loaded once something actually searches
+        from core.search import SearchIndex
+
+        with self._lock:
+            store = self._catalog()
+            if self._index is None:
+                self._index = SearchIndex((service, store.get(service).usrname) for service in store.services())
+            return self._index
+
+    @traced("search")
+    def search(self, query: str, limit=5, score_cutoff=60):
+        with self._lock:
+            return self.search_index().search(query, limit=limit, score_cutoff=score_cutoff)
+
+    def put(self, service: str, usrname: str, passwd: str):
+        with self.transaction() as tx:
+            tx.put(service, usrname, passwd)
+
+    def remove(self, service: str, usrname: str | None = None):
+        with self._lock:
+            store = self._catalog()
+            if service not in store or (usrname is not None and store.find(service, usrname) is None):
+                return
+            with self.transaction() as tx:
+                tx.remove(service, usrname)
+
+    @contextmanager
+    def transaction(self):
+        # Any number of edits, committed together: one journal entry, or one
+        # snapshot rewrite for batches too big to journal. The vault stays
+        # locked for the block, and an exception discards every edit.
+        with self._lock:
+            tx = Transaction(self)
+            yield tx
+            if tx.ops:
+                self._apply(tx.ops)
+
+    def save(self, store: RecordStore):
+        with self._lock, data_lock():
+            self._commit(store)
+            self._index = None
+
+    def rekey(self, fernet, kdf: int, params: tuple, salt: bytes):
+        # Re-encrypt every record under a new key, salt and KDF. The vault
+        # belongs to the new fernet afterwards, and the journal is folded in.
+        with self._lock, data_lock():
+            store = RecordStore(tuple(record) for record in self.records())
+            generation = self._disk_generation() + 1
+            header = Header(kdf, params, generation, salt)
+
+            self.fernet = fernet
+            try:
+                data, refs = pack_vault(fernet, header, new_bucket_key(),
+                                        ((r.service, r.usrname, encrypt_record(fernet, *r)) for r in store))
+                self._write(store, data, refs)
+            except Exception:
+                self.invalidate()
+                raise
+            self._index = None
+
+    def compact(self):
+        # Fold the journal into a new snapshot. The expensive part runs without
+        # the lock; the result is dropped if the vault changed in the meantime.
+        with self._lock:
+            if self._store is None or self._header is None or not self._journal_entries:
+                return
+            store = self._store.copy()
+            base, bucket_key, signature = self._header, self._bucket_key, self._signature
+
+        try:
+            data, refs = self._pack(store, base, bucket_key)
+        except VaultChangedError:
+            return
+
+        with self._lock, data_lock():
+            if self._stat_signature() == signature and self._disk_generation() == base.generation:
+                self._write(store, data, refs)
+
+    def invalidate(self):
+        with self._lock:
+            self._store = None
+            self._header = None
+            self._bucket_key = None
+            self._signature = None
+            self._index = None
+            self._journal_entries = 0
+            self._journal_size = 0
+            self._journal_torn = False
+
+    def _read(self, read):
+        with self._lock:
+            try:
+                return read()
+            except VaultChangedError:
+                return read()
+
+    def _catalog(self) -> RecordStore:
+        # Records as listed by the snapshot index plus the journal; passwords may still be unresolved
+        if self._store is None or self._stat_signature() != self._signature:
+            self._load()
+        return self._store
+
+    @traced("vault")
+    def _load(self):
+        # Starts from nothing, so a load that fails part way leaves no stale cache behind
+        self.invalidate()
+        self._signature = self._stat_signature()
+        try:
+            reader = VaultReader.open(self._path())
+        except FileNotFoundError:
+            self._store, self._header, self._bucket_key = RecordStore(), None, None
+            return
+
+        if reader is None:
+            with data_lock():
+                # Another process may have migrated it while we waited
+                reader = VaultReader.open(self._path())
+                if reader is None:
+                    self._migrate()
+                    return
+                self._signature = self._stat_signature()
+
+        with reader:
+            self._header = reader.header
+            try:
+                self._bucket_key = reader.bucket_key(self.fernet)
+                entries = reader.read_index(self.fernet)
+            except InvalidToken:
+                # Nothing is cached, so no write can go ahead under this key
+                self.invalidate()
+                raise WrongKeyError() from None
+
+        store = RecordStore()
+        for service, usrname, offset, length in entries:
+            store.insert(Record(service, usrname, None, (offset, length)))
+
+        journal = self._read_journal()
+        ops, self._journal_size = decode_entries(self.fernet, journal, self._header.generation)
+        apply_ops(store, ops)
+        self._journal_entries = journal.count(b"\n", 0, self._journal_size)
+        self._journal_torn = self._journal_size != len(journal)
+        self._store = store
+
+    @traced("decrypt")
+    def _get_direct(self, services) -> dict:
+        # Nothing cached yet (a one-shot CLI lookup): decrypt only the directory,
+        # the services' buckets and first records, and the journal, once for
+        # the whole batch. {service: Record} for each service that exists.
+        try:
+            reader = VaultReader.open(self._path())
+        except FileNotFoundError:
+            return {}
+        if reader is None:
+            store = self._catalog()
+            found = {service: store.get(service) for service in services if service in store}
+            self._resolve(found.values())
+            return found
+
+        with reader:
+            try:
+                entries = reader.find_many(self.fernet, services)
+            except InvalidToken:
+                raise WrongKeyError() from None
+
+            accounts = RecordStore()
+            for service_entries in entries.values():
+                for service, usrname, offset, length in service_entries:
+                    accounts.insert(Record(service, usrname, None, (offset, length)))
+            ops, _ = decode_entries(self.fernet, self._read_journal(), reader.header.generation)
+            apply_ops(accounts, [op for op in ops if op[1] in entries])
+
+            found = {}
+            for service in services:
+                record = accounts.get(service)
+                if record is None:
+                    continue
+                if record.passwd is None:
+                    record.passwd = decrypt_record(self.fernet, reader.read_token(*record.ref), service, record.usrname)
+                found[service] = record
+        return found
+
+    def _migrate(self):
+        # Version 1 file: decrypt the whole CSV once and rewrite it in the
+        # version 2 layout, checking every record survives the round trip first
+        read_dat = get_data_file(self.fernet)  # Raises WrongKeyError before anything is cached
+        self._store, self._header, self._bucket_key = RecordStore(), None, None
+        if read_dat is None:
+            return
+
+        store = parse_csv(read_dat)
+        data, refs = self._pack(store, None, None)
+        copy = VaultReader(io.BytesIO(data), unpack_header(data))
+        entries = copy.read_index(self.fernet)
+        if len(entries) != len(store):
+            raise VaultFormatError("Migration check failed: record count changed")
+        for record, (service, usrname, offset, length) in zip(store, entries):
+            passwd = decrypt_record(self.fernet, copy.read_token(offset, length), service, usrname)
+            if (service, usrname, passwd) != tuple(record):
+                raise VaultFormatError(f"Migration check failed for '{record.service}'")
+        self._write(store, data, refs)
+
+    @traced("decrypt")
+    def _resolve(self, records):
+        pending = [record for record in records if record.passwd is None]
+        if not pending:
+            return
+
+        with self._open_snapshot(self._header) as reader:
+            for record in pending:
+                token = reader.read_token(*record.ref)
+                record.passwd = decrypt_record(self.fernet, token, record.service, record.usrname)
+
+    def _apply(self, ops):
+        # With the lock held nobody else can write, so once _catalog() has
+        # re-read whatever changed on disk the edit can't clobber anything.
+        # The generation checks catch changes a stat signature misses; the
+        # ops are then replayed on a fresh read.
+        with data_lock():
+            for attempt in range(COMMIT_ATTEMPTS):
+                store = self._catalog()
+                apply_ops(store, ops)
+                try:
+                    if len(ops) > JOURNAL_MAX_ENTRIES:
+                        self._commit(store)
+                    else:
+                        self._append(store, ops)
+                    break
+                except VaultChangedError:
+                    self.invalidate()
+                    if attempt == COMMIT_ATTEMPTS - 1:
+                        raise
+
+        for service in {op[1] for op in ops}:
+            self._reindex(service)
+
+    @traced("vault")
+    def _append(self, store, ops):
+        # Without a version 2 snapshot there is nothing to journal against yet
+        if self._header is None:
+            self._commit(store)
+            return
+
+        # Only a key that opened this snapshot's directory may journal against it
+        if self._bucket_key is None:
+            raise WrongKeyError()
+        if self._disk_generation() != self._header.generation:
+            raise VaultChangedError()
+        entry = encode_entry(self.fernet, self._header.generation, ops)
+        try:
+            if self._journal_torn:
+                # Drop the tail of a crashed append, or the next entry would be glued to it
+                os.truncate(self._journal_path(), self._journal_size)
+                self._journal_torn = False
+            append_binary_data(entry, JOURNAL_FILE)
+        except Exception:
+            self.invalidate()
+            raise
+        self._journal_entries += 1
+        self._journal_size += len(entry)
+        self._signature = self._stat_signature()
+
+        if self._journal_entries >= JOURNAL_MAX_ENTRIES or self._journal_size >= JOURNAL_MAX_BYTES:
+            self._schedule_compaction()
+
+    def _schedule_compaction(self):
+        # Not a daemon thread: a CLI process waits for it before exiting
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self.compact, name="vault-compaction")
+        self._compactor.start()
+
+    @traced("vault")
+    def _commit(self, store):
+        try:
+            data, refs = self._pack(store, self._header, self._bucket_key)
+            self._write(store, data, refs)
+        except Exception:
+            # The cached store may already hold the failed edit
+            self.invalidate()
+            raise
+
+    def _pack(self, store, base, bucket_key) -> tuple[bytes, list]:
+        # base is the header of the snapshot the store's refs point into
+        # Generations only go up, even over a vault created again from scratch
+        generation = max(self._disk_generation(), base.generation if base is not None else 0) + 1
+        if base is not None:
+            header = base._replace(generation=generation)
+        else:
+            # A new or version 1 vault: record the KDF its key was derived with
+            kdf, kdf_params = get_kdf()
+            header = Header(kdf, kdf_params, generation, get_salt())
+        if bucket_key is None:
+            bucket_key = new_bucket_key()
+
+        # Untouched records keep their existing tokens; only edits are encrypted
+        area = b""
+        if any(record.ref is not None for record in store):
+            with self._open_snapshot(base) as reader:
+                area = reader.read_records_area()
+
+        def token(record):
+            if record.ref is not None:
+                offset, length = record.ref
+                return area[offset:offset + length]
+            return encrypt_record(self.fernet, *record)
+
+        return pack_vault(self.fernet, header, bucket_key, ((r.service, r.usrname, token(r)) for r in store))
+
+    def _write(self, store, data, refs):
+        write_binary_data(data, DATA_FILE)
+        # The journal was written against the previous generation
+        delete_binary_data(JOURNAL_FILE)
+
+        for record, ref in zip(store, refs):
+            record.ref = ref
+        self._store = store
+        self._header = unpack_header(data)
+        self._bucket_key = VaultReader(io.BytesIO(data), self._header).bucket_key(self.fernet)
+        self._journal_entries = self._journal_size = 0
+        self._journal_torn = False
+        self._signature = self._stat_signature()
+
+    def _open_snapshot(self, header) -> VaultReader:
+        # Refs are only meaningful against the exact file generation they came from
+        try:
+            reader = VaultReader.open(self._path())
+        except FileNotFoundError:
+            reader = None
+        if reader is None or header is None or reader.header.generation != header.generation:
+            if reader is not None:
+                reader.close()
+            self.invalidate()
+            raise VaultChangedError()
+        return reader
+
+    def _disk_generation(self) -> int:
+        # Generation of the snapshot on disk right now; 0 for none or version 1
+        header = unpack_header(read_binary_head(DATA_FILE, HEADER.size) or b"")
+        return header.generation if header is not None else 0
+
+    def _read_journal(self) -> bytes:
+        try:
+            with open(self._journal_path(), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return b""
+
+    def _reindex(self, service):
+        if self._index is None:
+            return
+        record = self._store.get(service)
+        if record is None:
+            self._index.remove(service)
+        else:
+            self._index.add(service, record.usrname)
+
+    def _path(self):
+        return get_data_folder() / DATA_FILE
+
+    def _journal_path(self):
+        return get_data_folder() / JOURNAL_FILE
+
+    def _stat_signature(self):
+        folder = get_data_folder()
+        signature = []
+        for path in (folder / DATA_FILE, folder / JOURNAL_FILE):
+            try:
+                st = os.stat(path)
+                signature.append((st.st_mtime_ns, st.st_size, st.st_ino))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+_vault = None
+
+def get_vault(fernet) -> Vault:
+    # One vault per unlocked session: a new fernet means a new (re)unlock
+    global _vault
+    if _vault is None or _vault.fernet is not fernet:
+        _vault = Vault(fernet)
+    return _vault
+
+def close_vault():
+    global _vault
+    _vault = None
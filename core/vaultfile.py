@@ -0,0 +1,202 @@
+########################
+## VAULT FILE METHODS ##
+########################
+
+# Version 2 layout of the data file:
+#
+#   header | Fernet(directory) | Fernet(bucket) ... | Fernet(record) ...
+#
+# The header is plain: magic, format version, KDF id and params, generation,
+# salt and the sizes of the index region. The directory holds a random bucket
+# key and the position of each index bucket. Services are spread over buckets
+# by a keyed hash, and each bucket lists its records' service, username and
+# token position, so one credential is read by decrypting the directory, one
+# bucket and one record. Version 1 files are just salt || Fernet(CSV) and are
+# migrated on first load.
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import struct
+from typing import NamedTuple
+
+MAGIC = b"PMV2"
+FORMAT_VERSION = 2
+
+BUCKET_KEY_SIZE = 32
+BUCKET_TARGET = 64  # Records per index bucket
+
+# magic | format version | kdf id | kdf params (3) | generation | salt | directory size | index size
+HEADER = struct.Struct(">4sBB3IQ16sII")
+
+class VaultFormatError(ValueError):
+    pass
+
+class WrongKeyError(Exception):
+    # The key doesn't open this vault: a wrong password, or a session key left
+    # over from before the vault was set up again or re-keyed
+    def __init__(self, message="The key doesn't open this vault"):
+        super().__init__(message)
+
+class Header(NamedTuple):
+    kdf: int
+    kdf_params: tuple
+    generation: int
+    salt: bytes
+    directory_size: int = 0
+    index_size: int = 0  # Directory plus buckets
+    version: int = FORMAT_VERSION
+
+    @property
+    def records_start(self) -> int:
+        return HEADER.size + self.index_size
+
+def pack_header(header: Header) -> bytes:
+    return HEADER.pack(MAGIC, header.version, header.kdf, *header.kdf_params, header.generation,
+                       header.salt, header.directory_size, header.index_size)
+
+def unpack_header(data: bytes) -> Header | None:
+    # None means a version 1 file (or no file at all)
+    if len(data) < HEADER.size or not data.startswith(MAGIC):
+        return None
+    _, version, kdf, p1, p2, p3, generation, salt, directory_size, index_size = HEADER.unpack_from(data)
+    if version != FORMAT_VERSION:
+        raise VaultFormatError(f"Unsupported vault format version {version}")
+    return Header(kdf, (p1, p2, p3), generation, salt, directory_size, index_size, version)
+
+def new_bucket_key() -> bytes:
+    return os.urandom(BUCKET_KEY_SIZE)
+
+def bucket_of(bucket_key: bytes, service: str, buckets: int) -> int:
+    digest = hmac.new(bucket_key, service.encode("utf-8"), hashlib.sha256).digest()
+    return int.from_bytes(digest[:8], "big") % buckets
+
+def encrypt_record(fernet, service: str, usrname: str, passwd: str) -> bytes:
+    # Service and username are sealed in with the password, so record tokens
+    # can't be swapped between index entries unnoticed
+    return fernet.encrypt(json.dumps([service, usrname, passwd]).encode("utf-8"))
+
+def decrypt_record(fernet, token: bytes, service: str, usrname: str) -> str:
+    stored_service, stored_usrname, passwd = json.loads(fernet.decrypt(token))
+    if (stored_service, stored_usrname) != (service, usrname):
+        raise VaultFormatError(f"Record for '{service}' does not match its index entry")
+    return passwd
+
+def pack_vault(fernet, header: Header, bucket_key: bytes, items) -> tuple[bytes, list]:
+    # items: (service, usrname, token) in store order.
+    # Returns the file contents and each item's (offset, length).
+    items = list(items)
+    buckets = [[] for _ in range(max(1, len(items) // BUCKET_TARGET))]
+    refs = []
+    offset = 0
+    for seq, (service, usrname, token) in enumerate(items):
+        ref = (offset, len(token))
+        buckets[bucket_of(bucket_key, service, len(buckets))].append([seq, service, usrname, *ref])
+        refs.append(ref)
+        offset += len(token)
+
+    bucket_tokens = [fernet.encrypt(json.dumps(bucket).encode("utf-8")) for bucket in buckets]
+    positions = []
+    position = 0
+    for token in bucket_tokens:
+        positions.append([position, len(token)])
+        position += len(token)
+
+    directory = fernet.encrypt(json.dumps({
+        "generation": header.generation,
+        "bucket_key": base64.b64encode(bucket_key).decode("ascii"),
+        "buckets": positions,
+    }).encode("utf-8"))
+
+    header = header._replace(directory_size=len(directory), index_size=len(directory) + position)
+    return b"".join([pack_header(header), directory, *bucket_tokens, *(token for _, _, token in items)]), refs
+
+class VaultReader:
+    # Random access over an open version 2 data file
+    def __init__(self, file, header: Header):
+        self.file = file
+        self.header = header
+        self._directory = None
+
+    @classmethod
+    def open(cls, path):
+        file = open(path, "rb")
+        try:
+            header = unpack_header(file.read(HEADER.size))
+        except Exception:
+            file.close()
+            raise
+        if header is None:
+            file.close()
+            return None
+        return cls(file, header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    def read_directory(self, fernet) -> dict:
+        # Raises InvalidToken for a wrong key, so this doubles as the password check
+        if self._directory is None:
+            directory = json.loads(fernet.decrypt(self._read(HEADER.size, self.header.directory_size)))
+            if directory.get("generation") != self.header.generation:
+                raise VaultFormatError("Vault header does not match its index")
+            directory["bucket_key"] = base64.b64decode(directory["bucket_key"])
+            self._directory = directory
+        return self._directory
+
+    def bucket_key(self, fernet) -> bytes:
+        return self.read_directory(fernet)["bucket_key"]
+
+    def read_bucket(self, fernet, bucket: int) -> list:
+        position, length = self.read_directory(fernet)["buckets"][bucket]
+        return json.loads(fernet.decrypt(self._read(HEADER.size + self.header.directory_size + position, length)))
+
+    def read_index(self, fernet) -> list:
+        # [[service, usrname, offset, length], ...] in store order
+        entries = []
+        for bucket in range(len(self.read_directory(fernet)["buckets"])):
+            entries.extend(self.read_bucket(fernet, bucket))
+        entries.sort(key=lambda entry: entry[0])
+        return [entry[1:] for entry in entries]
+
+    def find(self, fernet, service: str) -> list:
+        # Index entries of one service, decrypting a single bucket
+        return self.find_many(fernet, [service])[service]
+
+    def find_many(self, fernet, services) -> dict:
+        # {service: index entries} for each service, decrypting each bucket involved once
+        directory = self.read_directory(fernet)
+        by_bucket = {}
+        for service in services:
+            by_bucket.setdefault(bucket_of(directory["bucket_key"], service, len(directory["buckets"])), set()).add(service)
+
+        found = {}
+        for bucket, wanted in by_bucket.items():
+            entries = sorted(entry for entry in self.read_bucket(fernet, bucket) if entry[1] in wanted)
+            for service in wanted:
+                found[service] = []
+            for entry in entries:
+                found[entry[1]].append(entry[1:])
+        return found
+
+    def read_token(self, offset: int, length: int) -> bytes:
+        return self._read(self.header.records_start + offset, length)
+
+    def read_records_area(self) -> bytes:
+        self.file.seek(self.header.records_start)
+        return self.file.read()
+
+    def _read(self, offset: int, length: int) -> bytes:
+        self.file.seek(offset)
+        data = self.file.read(length)
+        if len(data) != length:
+            raise VaultFormatError("Vault file is truncated")
+        return data
@@ -0,0 +1,115 @@
+##############
+## WORDLIST ##
+##############
+
+# Built-in list for passphrases: short, common, lowercase English words with
+# no duplicates, so each word adds log2(len(WORDS)) bits. `generate --wordlist`
+# takes a longer list (e.g. EFF's large wordlist) for more bits per word.
+
+WORDS = tuple("""
+able acid acre actor adapt admit adopt adult affix agent agile aging agree ahead aide aim
+air aisle alarm album alert algae alibi alien align alike alive alley allow alloy almond
+aloft alone along aloud alpha alps altar alter amber amend ample amuse anchor angel anger
+angle ankle annex anvil apart apex apple apply april apron arbor arch arena argue arise
+armor army aroma arrow art ashes aside asked aspen asset atlas atom attic audio audit
+august aunt autumn avid avoid awake award aware awful axis bacon badge bagel baker
+balmy bamboo banjo barge barn baron basil basin batch bath baton beach beacon beam
+bean bear beard beast beat bed beech beef begin being bell belly below bench berry
+bike bingo birch bird bison black blade blank blast blaze blend bless blimp blink bliss
+block bloom blossom blue blunt blush board boast boat body bold bolt bonus book boost
+boot booth border boss botany bottle bounce bound bowl boxer brain brake brand brass
+brave bread break brick bride brief bright brim brisk broad brook broom brown brush
+bubble bucket buddy budget buffer build bulb bulk bunch bundle bunny burst bush butter
+button buyer cabin cable cactus cadet cage cake calm camel camera camp canal candle
+candy canoe canvas canyon cape card cargo carol carpet carrot carry carton carve case
+cash castle casual catch cattle cause cave cedar cell cello cement cereal chain chair
+chalk champ chant chaos charm chart chase cheek cheer cheese chef cherry chess chest
+chick chief child chili chill chime chin chip chirp choice choir chord chorus chrome
+chunk cider cigar cinema circle circus citrus city civic claim clam clap class claw
+clay clean clear clerk click cliff climb cling clip cloak clock close cloth cloud clown
+club clue coach coast coat cobra cocoa coconut code coffee coin cola cold collar colony
+color comet comic comma coral cord core cork corn corner cosmic cotton couch cougar
+count county course court cousin cover cowboy coyote crab craft crane crate crater
+crawl crayon crazy cream credit creek crew cricket crisp critic crop cross crowd crown
+crumb crust crystal cube cuff cup curb cure curl curry curve cushion custom cycle
+cymbal daisy dance dart dash data dawn deal debut decal decor decoy deer degree delta
+demo denim dense dent depot depth derby desert design desk detail device dial diary
+diet digit dime diner dingo dinner dish disk ditch diver dizzy dock doctor dodge dolphin
+domain dome donor donut door dose dough dove draft dragon drama drape draw dream dress
+drift drill drink drive drone drum duck duet dune dusk dust duty dwarf eager eagle
+early earth easel east easy echo eclipse edge eel effort eight elbow elder elect elf
+elk elm ember emblem empty enact end energy engine enjoy enter entry envoy epic equal
+era erase errand essay ether even event exact exam excel exile exit exotic expert extra
+fable fabric face facet fact fade fair faith falcon fame fancy farm fast fault fawn
+feast feather fence fern ferry fetch fever fiber fiddle field fifty fig film filter final
+finch finger finish fiord fire firm first fish five flag flame flash flask flat flavor
+fleet flick flint float flock flood floor flora flour flower fluid flute flyer foam
+focus fog foil folk font food forest forge fork form fort forum fossil found fox frame
+fresh friend fringe frog front frost fruit fudge fuel fun fungus funnel fury fusion
+gadget galaxy gallon game gamma garage garden garlic gate gauge gear gecko gem genre
+gentle giant gift ginger giraffe glad glass glide globe glory glove glow glue goal goat
+gold golf good goose gorge gospel gown grace grade grain grand grape graph grass gravel
+gravy great green grid grill grin grip groove ground group grove growth guard guava
+guess guest guide guitar gulf gust habit hair half hall halo hammer hand happy harbor
+hardy harp harvest hat hatch haven hawk hazel head heart heat hedge helmet help herb
+herd hero heron hiker hill hinge hippo hobby hockey holly home honey hood hook hope
+horizon horn horse host hotel hound hour house hover human humor hunch hunter hurry
+husky hut hybrid icon idea igloo image impact inch index indigo ink inlet input insect
+inside invite iris iron island item ivory ivy jacket jade jaguar jam jar jasmine jazz
+jeans jelly jersey jewel jingle job jockey jog join joke jolly journal journey joy judge
+juice jumbo jump jungle junior jury kayak keen kettle key kick kid kind king kiosk kite
+kitten kiwi knee knife knight knob knot koala label lace ladder lady lake lamb lamp
+lance land lane lantern laptop large laser latch later laugh lava lawn layer leader
+leaf league lean learn lease ledge legend lemon lens leopard lesson letter level lever
+liberty light lilac lily limb lime limit linen lion liquid list little lizard llama load
+loaf lobby lobster local lock locust lodge loft logic lotus loud lounge loyal lucky
+lumber lunar lunch lyric macaw magic magnet maize major mango manor maple marble march
+margin marine market marsh mask mason match matrix meadow medal melody melon member
+memo mental menu merit mesa metal meter method metro middle mild mile milk mill mimic
+mind mint minute mirror mist mixer model modem moment monk month moon moose morning
+mosaic moss motel moth motor mound mount mouse mouth movie muffin mural muse museum
+music mustard myth nacho napkin narrow nation native nature navy near nebula neck
+nectar needle neon nephew nerve nest net never new next nickel night noble noise noodle
+normal north nose notch note novel number nurse nutmeg oak oasis oat ocean octave offer
+office olive omega onion online opal open opera orbit orchid order organ origin otter
+ounce outer oval oven owl owner oxygen oyster pace paddle page paint palace palm panda
+panel panic papaya paper parade parcel park parrot party pasta paste patch path patio
+pause peach peak peanut pear pebble pecan pedal pencil people pepper perch permit
+person pet phone photo piano picnic pie pier pig pigeon pillar pillow pilot pine pink
+pint pioneer pipe pirate pitch pixel pizza place plain planet plank plant plate
+play plaza plum plume plus pocket poem poet point polar pole police pond pony pool
+poppy porch port poster potato pouch powder power prairie press pretty price pride
+prime print prism prize profit prompt proof proud prune puck puffin pulse puma pump
+pupil puppy purple puzzle pyramid quail quake query quest quick quiet quilt quiz quota
+rabbit raccoon race radar radio raft rail rain raisin rally ranch range rapid raven
+razor ready realm rebel recipe record red reef region relay relic remedy rent reply
+rescue resort rhyme ribbon rice rider ridge ring rinse ripple river road robin
+robot rock rocket rodeo roof room rooster root rope rose rotor round route rover royal
+ruby rudder rugby ruler rumor runner rural rust saddle safari saga sage sail salad
+salmon salon salt salute sample sand sandal satin sauce savvy scale scarf scene school
+scoop scooter score scout scrap screen script scroll sea seal season seat second secret
+sector seed select senior sense sequel series sermon shade shadow shaft shape share
+shark sheep shelf shell shield shift shine ship shirt shore short shovel shrimp shrub
+siege sierra signal silk silver simple siren sister sketch skill skirt sky slate sled
+sleep slice slide slope sloth smile smoke snack snail snake sneaker snow soap soccer
+sock sofa soil solar solid sonic sound soup south space spade spark speak spear spell
+sphere spice spider spike spin spiral splash spoke sponge spoon sport spot spray spring
+sprout spruce squad square squid stable stack staff stage stair stamp stand star start
+state station steam steel stem step stereo stick still sting stock stone stool storm
+story stove strap straw stream street stripe studio stump style sugar suit summer
+summit sun sunny super surf surge swamp swan sweater sweet swift swim swing switch sword
+symbol syrup system table tablet tackle taco tail talent tango tank tape target task
+taste tavern taxi teacup team teapot tempo tennis tent term test text theme thing
+thorn thread throne thumb thunder ticket tide tiger tile timber time tiny tissue title
+toast today token tomato tone tongue tool tooth topaz topic torch total totem tower
+town toy track tractor trade trail train tram trap travel tray treat tree trend trial
+tribe trick trio trip trophy trout truck trumpet trunk trust tulip tuna tunnel turkey
+turn turtle tutor tuxedo twig twin type umbrella uncle union unit upper urban usage
+usher valley valve vanilla vapor vase vast vector velvet vendor venue verb verse vessel
+veto video view villa vine vinyl violet violin visit visor vista vital vivid vocal voice
+volume vote voyage wafer wagon waist walnut walrus wander warm wave wax wealth weasel
+weather web wedge week well west whale wheat wheel whisk whistle wick wide widget width
+wigwam wild willow wind window wing winter wire wisdom wise witty wizard wolf wonder
+wood wool word work world worm wreath wren wrist yacht yard yarn year yeast yellow yield
+yodel yogurt young youth yoyo zebra zero zest zigzag zinc zipper zodiac zone zoom
+""".split())
@@ -1,18 +1,25 @@
-from core.data import get_credentials, get_services, add_service, remove_service, write_dataframe, create_empty_dataframe
-from core.crypto import get_fernet, prompt_for_password, data_exists
-from core.session import lock_session, is_session_valid
-from core.config import load_config, save_config
-from tui import LoginApp
-from rapidfuzz import process
 from getpass import getpass
 import cli
 
+# Each command imports only what it uses: Textual, pandas, rapidfuzz, cryptography
+# and keyring make up most of a short command's wall time. Tracing has to be
+# switched on before any traced module is imported, so core is imported after it.
+
+# Commands a running agent can answer without unlocking the vault again
+AGENT_COMMANDS = {"add", "get", "list", "search"}
+
 def main():
     # Parse command line arguments
     args = cli.parse_args()
+    if args.profile:
+        from core import trace
+        trace.enable(args.profile, args.cprofile)
+
+    from core.binary import data_exists
     
     # If no command is provided, run the TUI app
     if args.command is None:
+        from tui import LoginApp
         tui_app = LoginApp()
         tui_app.run()
         return
@@ -20,39 +27,85 @@ def main():
     # Securely prompt for password (used as encryption key) 
 
     # Skip for setup and lock commands
-    requires_unlock = args.command not in {"setup", "lock", "config", "help"}
+    requires_unlock = args.command not in {"setup", "lock", "config", "help", "kdf-benchmark", "generate"}
+    if args.command == "agent" and args.stop:
+        requires_unlock = False
 
-    if not data_exists() and args.command != "setup" and args.command != "config":
+    if not data_exists() and args.command not in {"setup", "config", "kdf-benchmark", "generate"}:
         print("❌ No data found. Please run `setup` to initialize the password manager.")
         return
 
-    if requires_unlock:
+    # A running agent already holds the unlocked vault
+    agent = None
+    if args.command in AGENT_COMMANDS:
+        from core.agent import connect_agent
+        agent = connect_agent()
+
+    if requires_unlock and agent is None:
+        from core.crypto import prompt_for_password
         fernet = prompt_for_password()
 
     if args.command == "add":
+        if agent is None:
+            from core.data import add_service
         try:
             user_password = getpass(prompt=f"Password for {args.service}: ")
         except Exception as e:
             print(f"❌ Error reading password: {e}")
             return
-        add_service(fernet, args.service, args.username, user_password)
+        if agent:
+            agent.add_service(args.service, args.username, user_password)
+        else:
+            add_service(fernet, args.service, args.username, user_password)
         print(f"✅ Added/Updated credentials for '{args.service}'.")
 
+        from core.breach import BreachCorpusError, check_password
+        try:
+            seen = check_password(user_password)
+        except (BreachCorpusError, OSError) as e:
+            print(f"⚠️ Breach check skipped: {e}")
+            seen = None
+        if seen:
+            print(f"❗ This password appears {seen:,} times in known breaches. Consider `generate` for a new one.")
+
     elif args.command == "remove":
+        from core.data import remove_service
         remove_service(fernet, args.service)
         print(f"✅ Removed credentials for '{args.service}'.")
 
     elif args.command == "get":
-        username, passwd = get_credentials(fernet, args.service)
-        if username is not None:
-            print(f"🔑 Service: {args.service}")
-            print(f"👤 Username: {username}")
-            print(f"🔒 Password: {passwd}")
+        if agent:
+            found = {}
+            for service in args.service:
+                username, passwd = agent.get_credentials(service)
+                if username is not None:
+                    found[service] = (username, passwd)
         else:
-            print(f"❌ No credentials found for '{args.service}'.")
+            from core.data import get_many_credentials
+            found = get_many_credentials(fernet, args.service)
+
+        if args.json:
+            import json
+            from core.batch import credential_result
+            for service in args.service:
+                print(json.dumps(credential_result(service, found)))
+            return
+
+        for service in args.service:
+            if service in found:
+                username, passwd = found[service]
+                print(f"🔑 Service: {service}")
+                print(f"👤 Username: {username}")
+                print(f"🔒 Password: {passwd}")
+            else:
+                print(f"❌ No credentials found for '{service}'.")
 
     elif args.command == "list":
-        services = get_services(fernet)
+        if agent:
+            services = agent.get_services()
+        else:
+            from core.data import get_services
+            services = get_services(fernet)
         if services:
             print("📋 Stored services:")
             for service in services:
@@ -61,25 +114,164 @@ def main():
             print("⚠️ No services stored yet.")
 
     elif args.command == "search":
-        services = get_services(fernet)
+        if agent:
+            services = agent.get_services()
+        else:
+            from core.data import get_services, search_services
+            services = get_services(fernet)
         if not services:
             print("⚠️ No services stored yet.")
             return
 
-        matches = process.extract(args.query, services, limit=5, score_cutoff=60)
+        if agent:
+            matches = agent.search_services(args.query, limit=5, score_cutoff=60)
+        else:
+            matches = search_services(fernet, args.query, limit=5, score_cutoff=60)
 
         if matches:
             print(f"🔍 Matches for '{args.query}':")
-            for match, score, _ in matches:
+            for match, score in matches:
                 print(f" - {match} ({score:.0f}%)")
         else:
             print("❌ No close matches found.")
     
+    elif args.command == "import":
+        import csv
+        from core.transfer import import_credentials, is_encrypted_export
+        try:
+            passphrase = None
+            if is_encrypted_export(args.file):
+                passphrase = getpass("Export passphrase: ").encode("utf-8")
+            report = import_credentials(fernet, args.file, args.format, overwrite=args.overwrite,
+                                        dry_run=args.dry_run, passphrase=passphrase)
+        except (OSError, ValueError, csv.Error) as e:
+            print(f"❌ Could not import '{args.file}': {e}")
+            return
+        verb = "Would import" if args.dry_run else "Imported"
+        rate = report.read / report.seconds if report.seconds else 0
+        print(f"✅ {verb} {report.imported} credentials from {report.read} rows in {report.seconds:.2f}s ({rate:,.0f} rows/s).")
+        if report.existing:
+            print(f"⚠️ {report.existing} accounts already in the vault were skipped (use --overwrite to replace them).")
+        if report.duplicates:
+            print(f"⚠️ {report.duplicates} duplicate rows were skipped.")
+        if report.invalid:
+            print(f"❗ {report.invalid} rows without a service or password were skipped.")
+
+    elif args.command == "export":
+        import os
+        import sys
+        from core.transfer import export_credentials
+
+        passphrase = None
+        if args.encrypt:
+            try:
+                while True:
+                    pw1 = getpass("🧪 Export passphrase: ")
+                    pw2 = getpass("🔁 Confirm export passphrase: ")
+                    if pw1 != pw2:
+                        print("❗ Passphrases do not match. Try again.", file=sys.stderr)
+                    elif len(pw1) < 8:
+                        print("❗ Passphrase must be at least 8 characters.", file=sys.stderr)
+                    else:
+                        break
+            except Exception as e:
+                print(f"\n{e}", file=sys.stderr)
+                return
+            passphrase = pw1.encode("utf-8")
+
+        # Plaintext exports hold every password, so the file is created owner-only
+        try:
+            if args.file == "-":
+                out = sys.stdout.buffer
+            else:
+                out = os.fdopen(os.open(args.file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb")
+        except OSError as e:
+            print(f"❌ Could not write '{args.file}': {e}", file=sys.stderr)
+            return
+        try:
+            count, seconds = export_credentials(fernet, out, args.format, passphrase)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+        rate = count / seconds if seconds else 0
+        # Messages go to stderr so they don't end up in an export written to stdout
+        print(f"✅ Exported {count} credentials in {seconds:.2f}s ({rate:,.0f} records/s).", file=sys.stderr)
+
+    elif args.command == "audit":
+        from core.audit import SCORES, audit_vault
+        report = audit_vault(fernet, min_length=args.min_length, workers=args.workers)
+
+        if args.json:
+            import json
+            for entry in report.entries:
+                print(json.dumps({"service": entry.service, "username": entry.usrname, "length": entry.length,
+                                  "bits": entry.bits, "strength": SCORES[entry.score], "issues": list(entry.issues)}))
+            return
+
+        def accounts(group):
+            return ", ".join(f"{service} ({usrname})" if usrname else service for service, usrname in group)
+
+        print(f"🛡️ Audited {len(report.entries)} entries in {report.seconds:.2f}s.")
+        if report.reused:
+            print(f"🔁 Passwords used by more than one entry ({len(report.reused)}):")
+            for group in report.reused:
+                print(f" - {accounts(group)}")
+        if report.similar:
+            print(f"🪞 Near-identical passwords ({len(report.similar)} groups):")
+            for group in report.similar:
+                print(f" - {accounts(group)}")
+
+        flagged = [entry for entry in report.entries if {"weak", "short", "common"} & set(entry.issues)]
+        if args.all:
+            print("📋 All entries, weakest first:")
+        elif flagged:
+            print(f"⚠️ Weak, common or short passwords ({len(flagged)}):")
+        for entry in sorted(report.entries if args.all else flagged, key=lambda entry: entry.bits):
+            issues = f" [{', '.join(entry.issues)}]" if entry.issues else ""
+            print(f" - {accounts([(entry.service, entry.usrname)])}: {SCORES[entry.score]}, "
+                  f"{entry.bits:.0f} bits, {entry.length} characters{issues}")
+        if not (report.reused or report.similar or flagged):
+            print("✅ No issues found.")
+
+    elif args.command == "breach-check":
+        from core.breach import BreachCorpusError, breach_check_vault, get_corpus_path
+        path = args.corpus or get_corpus_path()
+        if path is None:
+            print("❌ No breach corpus. Pass --corpus or set one with `config --breach-corpus`.")
+            return
+        import sys
+        import time
+        start = time.perf_counter()
+        try:
+            breached = breach_check_vault(fernet, path)
+        except (BreachCorpusError, OSError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        seconds = time.perf_counter() - start
+        if not breached:
+            print(f"✅ No stored password appears in {path} ({seconds:.2f}s).")
+            return
+        print(f"❗ {len(breached)} stored passwords appear in known breaches ({seconds:.2f}s):")
+        for service, usrname, count in sorted(breached, key=lambda row: row[2], reverse=True):
+            account = f"{service} ({usrname})" if usrname else service
+            print(f" - {account}: seen {count:,} times")
+        sys.exit(1)
+
+    elif args.command == "batch":
+        import sys
+        from core.batch import run_batch
+        if not run_batch(fernet, sys.stdin, sys.stdout.write):
+            sys.exit(1)
+
     elif args.command == "lock":
+        from core.agent import stop_agent
+        from core.session import lock_session
         lock_session()
+        stop_agent()
         print("🔒 Session locked. Password will be required next time.")
 
     elif args.command == "setup":
+        from core.session import is_session_valid
         if is_session_valid() or data_exists():
             confirm = input("⚠️ Password manager already initialized. Reinitialize? (y/N): ").strip().lower()
             if confirm != 'y':
@@ -102,21 +294,147 @@ def main():
             return
 
         # Initialize encrypted vault and key
+        from core.agent import stop_agent
+        from core.crypto import derive_fernet
+        from core.session import lock_session
+        stop_agent()  # It holds the old vault's key
+        lock_session()  # So does the saved session, which would otherwise be used without a check
+        from core.data import create_empty_vault
         password = pw1.encode("utf-8")
-        # Ensure fernet is created with the new password
-        fernet = get_fernet(password)
-        write_dataframe(fernet, create_empty_dataframe())
+        # Derive from the new password, never from a cached session key
+        fernet, _ = derive_fernet(password)
+        create_empty_vault(fernet)
         print("✅ Vault setup complete. You can now add credentials using `add`.")
 
+    elif args.command == "generate":
+        import sys
+        from core.generator import Policy, PolicyError, describe, fit_entropy, generate, read_wordlist
+        try:
+            policy = Policy(
+                length=args.length,
+                classes=tuple(dict.fromkeys(args.classes)),
+                required=None if args.require is None else tuple(dict.fromkeys(args.require)),
+                exclude_look_alikes=args.no_look_alikes,
+                exclude=args.exclude,
+                words=args.words or (4 if args.wordlist else 0),
+                wordlist=read_wordlist(args.wordlist) if args.wordlist else None,
+                separator=args.separator,
+            )
+            if args.entropy is not None:
+                policy = fit_entropy(policy, args.entropy)
+            passwords = generate(policy, max(args.count, 0))
+        except (PolicyError, OSError) as e:
+            print(f"❌ {e}", file=sys.stderr)
+            sys.exit(1)
+        # The policy goes to stderr so the passwords can be piped on their own
+        print(f"🎲 {describe(policy)}", file=sys.stderr)
+        sys.stdout.write("".join(password + "\n" for password in passwords))
+
+    elif args.command == "kdf-benchmark":
+        from core.kdf import KDF_NAMES, calibrate, describe, memory_cost, time_derivation
+        target = args.target_ms / 1000
+
+        print(f"⏱️ Calibrating key derivation for a {args.target_ms} ms unlock...")
+        recommended = {}
+        for kdf, name in KDF_NAMES.items():
+            params = calibrate(kdf, target)
+            seconds = time_derivation(kdf, params, rounds=3)
+            recommended[name] = (kdf, params)
+            print(f" - {describe(kdf, params)}: {seconds * 1000:.0f} ms, "
+                  f"{1 / seconds:.2f} derivations/s, {memory_cost(kdf, params) / 2**20:.0f} MiB")
+
+        if data_exists():
+            from core.crypto import get_kdf
+            kdf, params = get_kdf()
+            seconds = time_derivation(kdf, params)
+            print(f"🔐 Current vault: {describe(kdf, params)}: {seconds * 1000:.0f} ms")
+
+        if args.rekey:
+            if not data_exists():
+                print("❌ No data found. Please run `setup` to initialize the password manager.")
+                return
+            from core.crypto import unlock
+            from core.data import rekey_vault
+            from core.session import save_session_key
+
+            # Re-keying needs the password itself, not just the session key
+            password = getpass("Master password: ").encode("utf-8")
+            unlocked = unlock(password)
+            if not unlocked:
+                print("❌ Invalid password.")
+                return
+            fernet, _ = unlocked
+            kdf, params = recommended[args.rekey]
+            from core.agent import stop_agent
+            stop_agent()  # It holds the old key
+            _, key = rekey_vault(fernet, password, kdf, params)
+            save_session_key(key)
+            print(f"✅ Vault re-encrypted with {describe(kdf, params)}.")
+
+    elif args.command == "agent":
+        from core.agent import AgentError, agent_supported, daemonize, get_socket_path, run_agent, stop_agent
+        from core.session import SESSION_DURATION
+        if args.stop:
+            if stop_agent():
+                print("🔒 Agent stopped.")
+            else:
+                print("⚠️ No agent is running.")
+            return
+        if not agent_supported():
+            print("❌ The agent needs Unix domain sockets, which this platform doesn't support.")
+            return
+
+        print(f"🤖 Agent serving {get_socket_path()} for {SESSION_DURATION} seconds.")
+        if args.foreground or daemonize():
+            try:
+                run_agent(fernet)
+            except (AgentError, OSError) as e:
+                print(f"❌ {e}")
+
     elif args.command == "help":
         cli.print_help()
 
     elif args.command == "config":
+        from core.config import load_config, save_config
         if args.set_dir:
             config = load_config()
             config["storage_dir"] = args.set_dir
             save_config(config)
             print(f"✅ Storage directory set to: {args.set_dir}")
+        if args.session_backend:
+            from core.session import lock_session
+            lock_session()  # Don't leave the key behind in the old backend
+            config = load_config()
+            config["session_backend"] = args.session_backend
+            save_config(config)
+            print(f"✅ Session backend set to: {args.session_backend}")
+        if args.sliding_session:
+            config = load_config()
+            config["sliding_session"] = args.sliding_session == "on"
+            save_config(config)
+            print(f"✅ Sliding session expiry turned {args.sliding_session}.")
+        if args.breach_corpus is not None:
+            import os
+            config = load_config()
+            config["breach_corpus"] = os.path.abspath(args.breach_corpus) if args.breach_corpus else None
+            save_config(config)
+            if args.breach_corpus:
+                print(f"✅ Breach corpus set to: {config['breach_corpus']}")
+            else:
+                print("✅ Breach corpus cleared.")
 
 if __name__ == "__main__":
-    main()
+    import sys
+    if getattr(sys, "frozen", False):
+        # Audits score large vaults in spawned processes
+        import multiprocessing
+        multiprocessing.freeze_support()
+    from core.vaultfile import WrongKeyError
+    try:
+        main()
+    except WrongKeyError as e:
+        # Most likely a session key from before the vault was set up again or re-keyed
+        from core.session import lock_session
+        lock_session()
+        print(f"❌ {e}. The saved session was cleared; run the command again to enter your master password.")
+        sys.exit(1)
@@ -1,12 +1,13 @@
-from tui.screens import EntryList, Search, AddEntry
+from tui.screens import EntryList, Search, AddEntry, Audit
 
+from core.async_vault import AsyncVault
 from core.config import load_config, save_config, DEFAULT_DATA_FOLDER, get_styles_paths
-from core.crypto import get_fernet, get_key, is_valid, data_exists
-from core.session import save_session_key
-from core.data import write_dataframe, create_empty_dataframe
+from core.crypto import data_exists
+from core.vaultfile import VaultFormatError
 
+from textual import work
 from textual.app import App, ComposeResult
-from textual.widgets import Input, Label, Button, Static, Checkbox
+from textual.widgets import Input, Label, Button, Static, Checkbox, LoadingIndicator
 from textual.containers import Vertical
 from textual.reactive import reactive
 
@@ -22,6 +23,7 @@ class LoginApp(App):
     LOGIN_BUTTON_ID = "login_button"
     CREATE_BUTTON_ID = "create_button"
     REMEMBER_ME_ID = "remember_me"
+    PROGRESS_ID = "progress"
 
     MAIN_SCREEN_ID = "main"
 
@@ -29,6 +31,7 @@ class LoginApp(App):
     confirm_password = reactive("")
     message = reactive("")
     session_exists = reactive(False)
+    busy = reactive(False)
 
     def compose(self) -> ComposeResult:
         if not data_exists():
@@ -59,25 +62,42 @@ class LoginApp(App):
             self._setup_password()
 
     def _submit_password(self):
+        if self.busy:
+            return  # Already unlocking, drop the repeat submit
         if self.password:
             password = self.password.encode('utf-8')
             if not data_exists():
                 self.message = "❌ No data found. Please run `setup` to initialize the password manager."
-            if (is_valid(get_fernet(password))):
-                self.fernet = get_fernet(password)
-                self.password = ""
-                if (self.query_one(f"#{self.REMEMBER_ME_ID}", Checkbox)).value:
-                    save_session_key(get_key(password))
-                    self.session_exists = True
-                self.push_screen(self.MAIN_SCREEN_ID)
             else:
-                self.message = "❌ Invalid password. Please try again."
+                remember = self.query_one(f"#{self.REMEMBER_ME_ID}", Checkbox).value
+                self._set_busy(True, "🔓 Unlocking...")
+                self._unlock(password, remember)
         else:
             self.message = "❌ Please enter a password."
         self.query_one(f"#{self.MESSAGE_ID}", Static).update(self.message)
         self.query_one(f"#{self.PASSWORD_ID}", Input).value = ""
 
+    @work(exclusive=True, group="unlock")
+    async def _unlock(self, password: bytes, remember: bool):
+        # Key derivation and the first decrypt run in the pool, off the event loop
+        try:
+            vault = await AsyncVault.unlock(password, remember)
+        except VaultFormatError as e:
+            self._set_busy(False, f"❌ {e}")
+            return
+        if vault is not None:
+            self._open_vault(vault)
+            self.password = ""
+            if remember:
+                self.session_exists = True
+            self._set_busy(False, "")
+            self.push_screen(self.MAIN_SCREEN_ID)
+        else:
+            self._set_busy(False, "❌ Invalid password. Please try again.")
+
     def _setup_password(self):
+        if self.busy:
+            return
         if self.password and self.confirm_password:
             if self.password == self.confirm_password:
                 if len(self.password) < 8:
@@ -86,18 +106,50 @@ class LoginApp(App):
                     config = load_config()
                     config["storage_dir"] = self.query_one(f"#{self.DATA_PATH_ID}", Input).value
                     save_config(config)
-                    password = self.password.encode('utf-8')
-                    save_session_key(get_key(password))
-                    self.fernet = get_fernet(password)
-                    write_dataframe(self.fernet, create_empty_dataframe())  # Initialize empty DataFrame
-                    self.session_exists = True
-                    self.push_screen(self.MAIN_SCREEN_ID)
+                    self._set_busy(True, "🔐 Creating vault...")
+                    self._create_vault(self.password.encode('utf-8'))
+                    return
             else:
                 self.message = "❗ Passwords do not match."
         else:
             self.message = "❌ Please enter both password fields."
         self.query_one(f"#{self.MESSAGE_ID}", Static).update(self.message)
 
+    @work(exclusive=True, group="unlock")
+    async def _create_vault(self, password: bytes):
+        self._open_vault(await AsyncVault.create(password))
+        self.password = ""
+        self.confirm_password = ""
+        self.session_exists = True
+        self._set_busy(False, "")
+        self.push_screen(self.MAIN_SCREEN_ID)
+
+    def _open_vault(self, vault: AsyncVault):
+        # Screens go through self.vault; self.fernet is kept for synchronous callers
+        self.vault = vault
+        self.fernet = vault.fernet
+
+    def key_rejected(self, error):
+        # The session key no longer opens the vault: forget it and ask for the password
+        self.session_exists = False
+        self._return_to_login(f"❌ {error}. Please log in again.")
+
+    @work(exclusive=True, group="unlock")
+    async def _return_to_login(self, message: str):
+        await self.vault.lock()
+        while len(self.screen_stack) > 1:
+            self.pop_screen()
+        self._set_busy(False, message)
+
+    def _set_busy(self, busy: bool, message: str):
+        # Keeps the inputs responsive but blocks resubmits while a worker runs
+        self.busy = busy
+        self.message = message
+        self.query_one(f"#{self.MESSAGE_ID}", Static).update(message)
+        self.query_one(f"#{self.PROGRESS_ID}", LoadingIndicator).display = busy
+        for button in self.query(Button):
+            button.disabled = busy
+
     def _compose_setup(self) -> Vertical:
         # Setup screen for first-time users
         return Vertical(
@@ -108,7 +160,8 @@ class LoginApp(App):
             Static("Data File Path", id="msg_path"),
             Input(value=DEFAULT_DATA_FOLDER, placeholder="Data File Path", id=self.DATA_PATH_ID),
             Checkbox("Remember me", id=self.REMEMBER_ME_ID, value=True),
-            Button("Create", id=self.CREATE_BUTTON_ID)
+            Button("Create", id=self.CREATE_BUTTON_ID),
+            LoadingIndicator(id=self.PROGRESS_ID)
         )
 
     def _compose_login(self) -> Vertical:
@@ -117,6 +170,7 @@ class LoginApp(App):
             Input(password=True, placeholder="Password", id=self.PASSWORD_ID),
             Checkbox("Remember me", id=self.REMEMBER_ME_ID, value=True),
             Button("Login", id=self.LOGIN_BUTTON_ID),
+            LoadingIndicator(id=self.PROGRESS_ID),
             Static(id=self.MESSAGE_ID)
         )
 
@@ -124,17 +178,21 @@ class LoginApp(App):
         self.install_screen(EntryList(), name=self.MAIN_SCREEN_ID)
         self.install_screen(AddEntry(), name="add")
         self.install_screen(Search(), name="search")
+        self.install_screen(Audit(), name="audit")
 
-    def _init_session(self):
+    @work(exclusive=True, group="unlock")
+    async def _init_session(self):
         if not data_exists():
             self.message = "❌ No data found. Please run `setup` to initialize the password manager."
+            return
+        # The keyring lookup can block, so it runs in the pool too
+        vault = await AsyncVault.resume()
+        if vault is None:
+            self.session_exists = False
         else:
-            try:
-                self.fernet = get_fernet()
-                self.session_exists = True  # Save the session key
-                self.push_screen(self.MAIN_SCREEN_ID)
-            except ValueError:
-                self.session_exists = False
+            self._open_vault(vault)
+            self.session_exists = True  # Save the session key
+            self.push_screen(self.MAIN_SCREEN_ID)
         
 if __name__ == "__main__":
     app = LoginApp()
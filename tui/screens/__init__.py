@@ -1,5 +1,6 @@
 from .main_menu import EntryList
 from .search import Search
 from .add_entry import AddEntry
+from .audit import Audit
 
-__all__ = ["EntryList", "Search", "AddEntry"]
\ No newline at end of file
+__all__ = ["EntryList", "Search", "AddEntry", "Audit"]
\ No newline at end of file
@@ -1,15 +1,14 @@
+from textual import work
 from textual.screen import Screen
 from textual.widgets import Button, Label, DataTable, Static, Input, Checkbox
 from textual.containers import Vertical, Horizontal
-import string
-import secrets
-
-from core.data import get_dataframe, add_service
+from core.breach import BreachCorpusError, check_password
+from core.generator import CLASSES, Policy, PolicyError, entropy_bits, generate_password
+from tui.screens.guard import vault_worker
 
 class AddEntry(Screen):
     def compose(self):
         self.generated_password = ""
-        self.df = get_dataframe(self.app.fernet)
 
         # Input fields row
         input_row = Horizontal(
@@ -64,15 +63,11 @@ class AddEntry(Screen):
                     self.query_one("#message", Static).update("⚠️ Fill all fields.")
                     return
 
-                # Add to DataFrame and table
-                add_service(self.app.fernet, service, username, password)
-                self.df = get_dataframe(self.app.fernet)  # Reload DataFrame
-
-                # Clear inputs and Notify
+                # Clear inputs right away; the write finishes in the background
                 for field_id in ["#service-input", "#username-input", "#password-input"]:
                     self.query_one(field_id, Input).value = ""
-                self.query_one("#message", Static).update("✅ Entry added.")
                 self.query_one("#service-input", Input).focus()
+                self._add_entry(service, username, password)
             case "back":
                 self.app.pop_screen()
             case "generate":
@@ -86,25 +81,35 @@ class AddEntry(Screen):
             self.query_one("#message", Static).update("❌ Invalid length.")
             return
 
-        use_upper = self.query_one("#upper", Checkbox).value
-        use_lower = self.query_one("#lower", Checkbox).value
-        use_digits = self.query_one("#digits", Checkbox).value
-        use_symbols = self.query_one("#symbols", Checkbox).value
-
-        charsets = ""
-        if use_upper:
-            charsets += string.ascii_uppercase
-        if use_lower:
-            charsets += string.ascii_lowercase
-        if use_digits:
-            charsets += string.digits
-        if use_symbols:
-            charsets += string.punctuation
-
-        if not charsets:
+        # Checkbox ids match the generator's class names
+        classes = tuple(name for name in CLASSES if self.query_one(f"#{name}", Checkbox).value)
+        if not classes:
             self.query_one("#message", Static).update("❌ No character sets selected.")
             return
 
-        self.generated_pw = ''.join(secrets.choice(charsets) for _ in range(length))
+        policy = Policy(length=length, classes=classes)
+        try:
+            self.generated_pw = generate_password(policy)
+        except PolicyError as e:
+            self.query_one("#message", Static).update(f"❌ {e}")
+            return
         self.query_one("#gen-display", Input).value = self.generated_pw
         self.query_one("#password-input", Input).value = self.generated_pw
+        self.query_one("#message", Static).update(f"🎲 {entropy_bits(policy):.0f} bits of entropy.")
+
+    @work(group="add")
+    @vault_worker
+    async def _add_entry(self, service, username, password):
+        vault = self.app.vault
+        await vault.add(service, username, password)
+        self.query_one("#message", Static).update(await self._added_message(password))
+
+    async def _added_message(self, password):
+        # Opening the corpus can wait on a cold disk, so it runs in the pool too
+        try:
+            seen = await self.app.vault.call(check_password, password)
+        except (BreachCorpusError, OSError) as e:
+            return f"✅ Entry added. ⚠️ Breach check skipped: {e}"
+        if seen:
+            return f"✅ Entry added. ❗ This password appears {seen:,} times in known breaches."
+        return "✅ Entry added."
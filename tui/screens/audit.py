@@ -0,0 +1,72 @@
+from textual import work
+from textual.screen import Screen
+from textual.widgets import Button, DataTable, Label, Static
+from textual.containers import Vertical, Horizontal
+
+from core.audit import SCORES, audit_vault
+from tui.screens.guard import vault_worker
+
+class Audit(Screen):
+    def compose(self):
+        self.table = DataTable(id="audit-table", cursor_type="row")
+        self.table.add_columns("Service", "Username", "Strength", "Bits", "Length", "Issues")
+
+        yield Vertical(
+            Horizontal(
+                Label("🛡️ Password Audit", id="title"),
+                Button("Back to Main Menu", id="back"),
+                id="header"),
+            Static("", id="message"),
+            self.table,
+            id="main-layout"
+        )
+
+    def on_screen_resume(self):
+        # The vault may have changed since the last visit
+        self.query_one("#message", Static).update("⏳ Auditing...")
+        self._run_audit()
+
+    def on_key(self, event):
+        match event.key:
+            case "escape" | "q":
+                self.app.pop_screen()
+            case "j":
+                self.table.action_cursor_down()
+            case "k":
+                self.table.action_cursor_up()
+            case "g":  # Go to top
+                self.table.cursor_coordinate = (0, 0)
+            case "G":  # Go to bottom
+                if self.table.row_count > 0:
+                    self.table.cursor_coordinate = (self.table.row_count - 1, 0)
+
+    def on_button_pressed(self, event):
+        if event.button.id == "back":
+            self.app.pop_screen()
+
+    @work(exclusive=True, group="audit")
+    @vault_worker
+    async def _run_audit(self):
+        # Decrypting and scoring a large vault takes a while; keep the UI responsive
+        vault = self.app.vault
+        self._show_report(await vault.call(audit_vault, vault.fernet))
+
+    def _show_report(self, report):
+        # Entries with the most issues first, then the weakest
+        entries = sorted(report.entries, key=lambda entry: (-len(entry.issues), entry.bits))
+        self.table.clear()
+        self.table.add_rows(
+            (entry.service, entry.usrname, SCORES[entry.score], f"{entry.bits:.0f}", str(entry.length), ", ".join(entry.issues))
+            for entry in entries
+        )
+
+        flagged = sum(1 for entry in entries if entry.issues)
+        if not entries:
+            summary = "⚠️ No entries to audit yet."
+        elif not flagged:
+            summary = f"✅ No issues in {len(entries)} entries."
+        else:
+            summary = (f"⚠️ {flagged} of {len(entries)} entries have issues: {len(report.reused)} reused and "
+                       f"{len(report.similar)} near-identical passwords.")
+        self.query_one("#message", Static).update(summary)
+        self.table.focus()
@@ -0,0 +1,15 @@
+import functools
+
+from core.vaultfile import WrongKeyError
+
+def vault_worker(method):
+    # For worker coroutines that await the vault: a key that no longer opens it
+    # (the vault was set up again or re-keyed elsewhere) sends the app back to
+    # the login screen instead of ending it with a traceback
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        try:
+            return await method(self, *args, **kwargs)
+        except WrongKeyError as e:
+            self.app.key_rejected(e)
+    return wrapper
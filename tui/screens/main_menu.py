@@ -1,15 +1,16 @@
+from textual import work
 from textual.screen import Screen
-from textual.widgets import Button, Label, DataTable
+from textual.widgets import Button, Label
 from textual.containers import Vertical, Horizontal
 import pyperclip
 
-from core.data import get_dataframe, add_service, remove_service
-from core.session import lock_session
+from core.trace import traced
+from tui.screens.guard import vault_worker
 from tui.screens.modals import InputPromptScreen, FieldChoiceScreen
+from tui.screens.tables import CredentialTable
 
 class EntryList(Screen):
     def compose(self):
-        self.df = get_dataframe(self.app.fernet)
         self._vim_delete_mode = False  # Vim delete mode flag
 
         header = Horizontal(
@@ -17,39 +18,26 @@ class EntryList(Screen):
             Button("➕ Add Entry", id="add-entry"),
             Button("❌ Remove Selected", id="remove-entry"),
             Button("🔍 Search", id="search-entries"),
+            Button("🛡️ Audit", id="audit-entries"),
             Button("🔒", id="lock_button", tooltip="Lock"),
             id="header"
         )
 
-        # This would be populated with actual entries
-        if not self.df.empty:
-            self.table = DataTable(id="table")
-            self.table.cursor_type = "row"
-            _, _, self.password_key = self.table.add_columns("Service", "Username", "Password")
-            masked = "••••••"
-            self.real_passwords = {}  # Store real passwords for later use
-            for _, row in self.df.iterrows():
-                key = self.table.add_row(row["service"], row["usrname"], masked)
-                self.real_passwords[key] = row["passwd"]
-            self.table.focus()
-        else:
-            self.table = DataTable(id="table")
-            self.table.cursor_type = "row"
-            _, _, self.password_key = self.table.add_columns("Service", "Username", "Password")
+        # Populated on mount and updated in place on every resume
+        self.table = CredentialTable(placeholder="No entries available yet.", id="table")
         yield Vertical(
             header,
             self.table,
-            Label("↵ to copy | ⎋ to lock | / to search | a/i to add | r to replace | ctrl+q to close", id="footer"),
+            Label("↵ to copy | ⎋ to lock | / to search | A to audit | a/i to add | r to replace | ctrl+q to close", id="footer"),
             id="list-container"
         )
 
     def on_mount(self):
-        self.table = self.query_one("#table", DataTable)
-        self._refresh_table()
+        self._schedule_refresh()
 
     def on_screen_resume(self):
         # Refresh the table with the latest data when returning to this screen
-        self._refresh_table()
+        self._schedule_refresh()
 
     def on_key(self, event):
         if self.app.screen_stack[-1] != self:
@@ -59,8 +47,7 @@ class EntryList(Screen):
         match key:
             # Escape to lock & exit
             case "escape" | "q":
-                lock_session()
-                self.app.pop_screen()
+                self._lock()
                 return
             # Vim-style navigation
             case "j":
@@ -76,9 +63,10 @@ class EntryList(Screen):
                 self.app.push_screen("add")
             case "/":
                 self.app.push_screen("search")
+            case "A":
+                self.app.push_screen("audit")
             case "r":
-                if self.table.cursor_row is not None:
-                    self._prompt_replace(self.table.cursor_row)
+                self._prompt_replace()
             case "enter":
                 self._copy_selected_password()
             case "d":  # Vim-style 'dd' to delete
@@ -91,50 +79,41 @@ class EntryList(Screen):
             case _:
                 self._vim_delete_mode = False  # Reset on other keys
 
-    def on_data_table_row_highlighted(self, event) -> None:
-        # Mask all passwords
-        for row_key in self.real_passwords:
-            self.table.update_cell(row_key, self.password_key, "••••••")
-
-        # Reveal the highlighted password
-        highlighted_key = event.row_key
-        real_password = self.real_passwords.get(highlighted_key)
-        if real_password is not None:
-            self.table.update_cell(highlighted_key, self.password_key, real_password)
-
     def on_button_pressed(self, event):
         match event.button.id:
             case "add-entry":
                 self.app.push_screen("add")
-                self._refresh_table()
             case "search-entries":
                 self.app.push_screen("search")
+            case "audit-entries":
+                self.app.push_screen("audit")
             case "remove-entry":
                 self._delete_current_row()
             case "lock_button":
-                lock_session()
-                self.app.pop_screen()
+                self._lock()
 
     def _reset_vim_delete_mode(self):
         self._vim_delete_mode = False
 
-    def _delete_current_row(self):
-        if self.table.cursor_row is not None and not self.df.empty:
-            index = self.table.cursor_row
-            self.df = self.df.drop(self.df.index[index]).reset_index(drop=True)
-            remove_service(self.app.fernet, self.table.get_row_at(index)[0])
-            row_key, _ = self.table.coordinate_to_cell_key(self.table.cursor_coordinate)
-            self.real_passwords.pop(row_key, None)  # Remove from real passwords
-            self.table.remove_row(row_key)
-        if self.df.empty:
-            self.table.clear()
-            self.table.add_row("No entries available yet.", "", "")
+    @work(exclusive=True, group="lock")
+    async def _lock(self):
+        # Forget the session before leaving, so the login screen can't resume it
+        await self.app.vault.lock()
+        self.app.pop_screen()
+
+    @work(group="edit")
+    @vault_worker
+    async def _delete_current_row(self):
+        selected = self.table.selected()
+        if selected is not None:
+            service, username, _ = selected
+            self.table.remove(service, username)
+            await self.app.vault.remove(service, username)
 
     def _copy_selected_password(self):
-        if self.table.cursor_row is not None and self.table.has_focus:
-            index = self.table.cursor_row
-            row_key, _ = self.table.coordinate_to_cell_key(self.table.cursor_coordinate)
-            password = self.real_passwords.get(row_key)
+        selected = self.table.selected()
+        if selected is not None and self.table.has_focus:
+            password = selected[2]
 
             if password:
                 try:
@@ -145,28 +124,23 @@ class EntryList(Screen):
                 except Exception as e:
                     self.app.notify(f"❌ Copy failed: {str(e)}", severity="error")
 
-    def _prompt_replace(self, index):
-        service = self.df.iloc[index]["service"]
-        username = self.df.iloc[index]["usrname"]
+    def _prompt_replace(self):
+        selected = self.table.selected()
+        if selected is None:
+            return
+        service, username, _ = selected
 
         def after_field_selected(field):
             def after_value_entered(value):
                 if not value:
                     return
-                if field == "username":
-                    self.df.at[index, "usrname"] = value
-                elif field == "password":
-                    self.df.at[index, "passwd"] = value
-
-                # Save updated credentials
-                remove_service(self.app.fernet, service)
-                add_service(
-                    self.app.fernet,
-                    service,
-                    self.df.at[index, "usrname"],
-                    self.df.at[index, "passwd"],
-                )
-                self._refresh_table()
+                # Save updated credentials in a single write
+                def edit(tx):
+                    if field == "username":
+                        tx.update(service, username, new_usrname=value)
+                    elif field == "password":
+                        tx.update(service, username, passwd=value)
+                self._replace(edit)
 
             self.app.push_screen(
                 InputPromptScreen(
@@ -178,18 +152,20 @@ class EntryList(Screen):
 
         self.app.push_screen(FieldChoiceScreen(after_field_selected))
 
-    def _refresh_table(self):
-        self.df = get_dataframe(self.app.fernet)
-
-        self.table.clear()
-        self.real_passwords = {}
-
-        if self.df.empty:
-            self.table.add_row("No entries available yet.", "", "")
-            return
-
-        masked = "••••••"
-        for _, row in self.df.iterrows():
-            key = self.table.add_row(row["service"], row["usrname"], masked)
-            self.real_passwords[key] = row["passwd"]
-        self.table.focus()
\ No newline at end of file
+    @work(group="edit")
+    @vault_worker
+    async def _replace(self, edit):
+        await self.app.vault.transact(edit)
+        self._schedule_refresh()
+
+    def _schedule_refresh(self):
+        # A newer refresh supersedes one still waiting on the vault
+        self.run_worker(self._refresh_table(), exclusive=True, group="refresh")
+
+    @vault_worker
+    @traced("ui")
+    async def _refresh_table(self):
+        # Only rows that changed since the last refresh touch the table
+        self.table.set_rows(await self.app.vault.all_credentials())
+        if self.table.selected() is not None:
+            self.table.focus()
\ No newline at end of file
@@ -1,18 +1,17 @@
+from textual import work
 from textual.screen import Screen
-from textual.widgets import Button, Label, DataTable, Input
+from textual.widgets import Button, Label, Input
 from textual.containers import Vertical, Horizontal
 
-from rapidfuzz import process
 import pyperclip
 
-from core.data import get_services, get_credentials
+from core.trace import traced
+from tui.screens.guard import vault_worker
+from tui.screens.tables import CredentialTable
 
 class Search(Screen):
     def compose(self):
-        self.real_passwords = {}  # Store real passwords for later use
-        self.table = DataTable(id="search-results")
-        _, _, self.password_key = self.table.add_columns("Service", "Username", "Password")
-        self.table.cursor_type = "row"
+        self.table = CredentialTable(id="search-results")
 
         yield Vertical(
             Horizontal(
@@ -20,7 +19,7 @@ class Search(Screen):
                 Button("Back to Main Menu", id="back"),
                 id="header"),
             Horizontal(
-                Input(placeholder="Search by service name", id="search-input").focus(),
+                Input(placeholder="Search by service or username", id="search-input").focus(),
                 id="search-controls"
             ),
             self.table,
@@ -55,44 +54,45 @@ class Search(Screen):
     def on_input_changed(self, event: Input.Changed) -> None:
         if event.input.id == "search-input":
             self._submit_search()
-    
-    def on_data_table_row_highlighted(self, event) -> None:
-        # Mask all passwords
-        for row_key in self.real_passwords:
-            self.table.update_cell(row_key, self.password_key, "••••••")
-
-        # Reveal the highlighted password
-        highlighted_key = event.row_key
-        real_password = self.real_passwords.get(highlighted_key)
-        if real_password is not None:
-            self.table.update_cell(highlighted_key, self.password_key, real_password)
 
     def _submit_search(self):
         # Logic to perform search and display results
         query = self.query_one("#search-input", Input).value.strip()
         if not query:
-            self.query_one("#search-results", DataTable).clear()
-            self.real_passwords.clear()
+            self.workers.cancel_group(self, "search")
+            self._show_results(query, [])
             return
 
-        # Perform search
-        services = get_services(self.app.fernet)
-        results = process.extract(query, services, limit=5, score_cutoff=60)
-        results.sort(key=lambda x: x[1], reverse=True)
+        # Starting a new search cancels the one still in flight
+        self._run_search(query)
 
-        # Update the search results table
-        self.query_one("#search-results", DataTable).clear()
-        self.real_passwords.clear()
-        for service, _, _ in results:
-            username, password = get_credentials(self.app.fernet, service)
-            key = self.query_one("#search-results", DataTable).add_row(service, username, password)
-            self.real_passwords[key] = password
+    @work(exclusive=True, group="search")
+    @vault_worker
+    async def _run_search(self, query):
+        # A newer keystroke cancels this wait, and the search itself is
+        # skipped (None) if it hadn't started scoring yet
+        vault = self.app.vault
+        results = await vault.search(query, limit=5, score_cutoff=60)
+        if results is None:
+            return
+        credentials = await vault.many_credentials(service for service, _ in results)
+
+        rows = [(service, *credentials[service]) for service, _ in results if service in credentials]
+        self._show_results(query, rows)
+
+    @traced("ui")
+    def _show_results(self, query, rows):
+        # A slower, older search may still finish after the input has moved on
+        if query != self.query_one("#search-input", Input).value.strip():
+            return
+
+        # Update the search results table, keeping rows that are still in the results
+        self.table.set_rows(rows, exact_order=True)
 
     def _copy_selected_password(self):
-        if self.table.cursor_row is not None and self.table.has_focus:
-            index = self.table.cursor_row
-            row_key, _ = self.table.coordinate_to_cell_key(self.table.cursor_coordinate)
-            password = self.real_passwords.get(row_key)
+        selected = self.table.selected()
+        if selected is not None and self.table.has_focus:
+            password = selected[2]
 
             if password:
                 try:
@@ -0,0 +1,104 @@
+import json
+
+from rich.text import Text
+from textual.widgets import DataTable
+from textual.widgets.data_table import CellDoesNotExist
+
+from core.trace import traced
+
+MASK = "••••••"
+PLACEHOLDER_KEY = "__placeholder__"
+
+class _PasswordCell:
+    # Rendered as the password only while the cursor is on its row. Moving the
+    # cursor re-renders the two rows involved anyway, so revealing needs no
+    # update_cell, which would make the DataTable recompute every row's layout.
+    __slots__ = ("table", "key")
+
+    def __init__(self, table, key):
+        self.table = table
+        self.key = key
+
+    def __rich__(self):
+        if self.table.selected_key() == self.key:
+            return Text(self.table._rows[self.key][2])
+        return Text(MASK)
+
+class CredentialTable(DataTable):
+    # Service / username / password rows with every password masked but the
+    # highlighted one. set_rows() diffs against the rows already shown, so a
+    # refresh only adds, removes or updates what changed, and moving the
+    # cursor only re-renders the row it leaves and the row it lands on.
+    def __init__(self, placeholder: str | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.cursor_type = "row"
+        self.placeholder = placeholder
+        _, _, self.password_key = self.add_columns("Service", "Username", "Password")
+        self._rows = {}  # row key -> (service, usrname, passwd)
+        self._placeholder_shown = False
+
+    @staticmethod
+    def row_key(service: str, usrname: str) -> str:
+        return json.dumps([service, usrname])
+
+    @traced("ui")
+    def set_rows(self, rows, exact_order=False):
+        # rows: (service, usrname, passwd) in display order. Rows new to the
+        # table are appended, which matches the vault's own insertion order;
+        # with exact_order a reordered result (e.g. ranked matches) is redrawn.
+        rows = {self.row_key(service, usrname): (service, usrname, passwd) for service, usrname, passwd in rows}
+
+        if not rows:
+            self.clear()
+            self._rows.clear()
+            self._placeholder_shown = False
+            if self.placeholder:
+                self.add_row(self.placeholder, "", "", key=PLACEHOLDER_KEY)
+                self._placeholder_shown = True
+            return
+
+        if self._placeholder_shown:
+            self.remove_row(PLACEHOLDER_KEY)
+            self._placeholder_shown = False
+
+        for key in [key for key in self._rows if key not in rows]:
+            self.remove_row(key)
+            del self._rows[key]
+
+        for key, row in rows.items():
+            old = self._rows.get(key)
+            self._rows[key] = row
+            if old is None:
+                self.add_row(row[0], row[1], _PasswordCell(self, key), key=key)
+            elif old[2] != row[2] and key == self.selected_key():
+                self.update_cell(key, self.password_key, _PasswordCell(self, key))
+
+        if exact_order and list(self._rows) != list(rows):
+            self.clear()
+            self._rows.clear()
+            for key, row in rows.items():
+                self._rows[key] = row
+                self.add_row(row[0], row[1], _PasswordCell(self, key), key=key)
+
+    def remove(self, service: str, usrname: str):
+        key = self.row_key(service, usrname)
+        if key not in self._rows:
+            return
+        if len(self._rows) == 1:
+            self.set_rows([])
+            return
+        self.remove_row(key)
+        del self._rows[key]
+
+    def selected_key(self) -> str | None:
+        if not self.row_count or self.cursor_row is None:
+            return None
+        try:
+            row_key, _ = self.coordinate_to_cell_key(self.cursor_coordinate)
+        except CellDoesNotExist:
+            return None
+        return row_key.value if row_key.value in self._rows else None
+
+    def selected(self) -> tuple | None:
+        # (service, usrname, passwd) under the cursor, or None
+        return self._rows.get(self.selected_key())